@@ -0,0 +1,151 @@
+import csv
+from pathlib import Path
+import numpy as np
+from problem_solving_agent.geo import haversine_km
+
+# Lokasi dan jumlah slot SGB Jakarta hasil scraping, dasar semua instance benchmark
+STATION_CSV = Path(__file__).resolve().parents[2] / 'scraping' / 'data' / 'sgb_jakarta_completed.csv'
+
+# Sebaran sama dengan simulasi (simulation_testing): 60% EV di Jakarta Pusat/Selatan,
+# 40% di antaranya di sekitar hotspot, sisanya di seluruh Jakarta
+JAKARTA_BOUNDS = {'lat_min': -6.4, 'lat_max': -6.1, 'lon_min': 106.7, 'lon_max': 107.0}
+CENTRAL_SOUTH_JAKARTA_BOUNDS = {'lat_min': -6.25, 'lat_max': -6.15, 'lon_min': 106.78, 'lon_max': 106.85}
+HOTSPOT_CENTERS = [(-6.2088, 106.8456), (-6.2088, 106.8200)]  # Manggarai, Setiabudi
+
+NEAREST_STATIONS = 8  # sama dengan update_energy_distance_and_travel_time_all
+
+
+def load_stations(csv_path=STATION_CSV):
+    # [(lat, lon, jumlah slot)] sesuai urutan CSV
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return [
+            (float(row['Latitude']), float(row['Longitude']), int(row['Jumlah Slot']))
+            for row in csv.DictReader(f)
+        ]
+
+
+def _uniform_in(rng, bounds, n):
+    lat = rng.uniform(bounds['lat_min'], bounds['lat_max'], n)
+    lon = rng.uniform(bounds['lon_min'], bounds['lon_max'], n)
+    return lat, lon
+
+
+def _offset(rng, lat, lon, max_distance_km):
+    # Titik acak dalam radius max_distance_km dari (lat, lon)
+    bearing = rng.uniform(0, 2 * np.pi, len(lat))
+    distance = rng.uniform(0, max_distance_km, len(lat))
+    return (
+        lat + (distance / 111.0) * np.cos(bearing),
+        lon + (distance / (111.0 * np.cos(np.radians(lat)))) * np.sin(bearing),
+    )
+
+
+def station_locations(rng, n_station, csv_path=STATION_CSV):
+    # Stasiun asli lebih dulu, stasiun tambahan ditaruh di sekitar stasiun asli acak
+    base = load_stations(csv_path)[:n_station]
+    lat = np.array([s[0] for s in base])
+    lon = np.array([s[1] for s in base])
+    slots = np.array([s[2] for s in base])
+
+    extra = n_station - len(base)
+    if extra > 0:
+        anchor = rng.integers(0, len(base), extra)
+        extra_lat, extra_lon = _offset(rng, lat[anchor], lon[anchor], 3.0)
+        lat = np.concatenate([lat, extra_lat])
+        lon = np.concatenate([lon, extra_lon])
+        slots = np.concatenate([slots, rng.choice([8, 12], extra)])
+    return lat, lon, slots
+
+
+def ev_locations(rng, n_ev):
+    lat, lon = _uniform_in(rng, JAKARTA_BOUNDS, n_ev)
+    central = rng.random(n_ev) < 0.6
+    central_lat, central_lon = _uniform_in(rng, CENTRAL_SOUTH_JAKARTA_BOUNDS, n_ev)
+    lat[central], lon[central] = central_lat[central], central_lon[central]
+
+    hotspot = central & (rng.random(n_ev) < 0.4)
+    centers = np.array(HOTSPOT_CENTERS)[rng.integers(0, len(HOTSPOT_CENTERS), n_ev)]
+    lat[hotspot] = centers[hotspot, 0] + rng.uniform(-0.018, 0.018, hotspot.sum())
+    lon[hotspot] = centers[hotspot, 1] + rng.uniform(-0.018, 0.018, hotspot.sum())
+    return lat, lon
+
+
+def generate_instance(
+    n_ev,
+    n_station=81,
+    seed=0,
+    low_battery_share=0.3,
+    fixed_share=0.03,
+    swap_threshold=25,
+    csv_path=STATION_CSV
+):
+    # Instance sintetis seperti Jakarta, dalam format yang sama dengan
+    # get_fleet_dict_and_station_list: (station_list, ev_dict). low_battery_share adalah
+    # porsi EV dengan baterai <= swap_threshold (kandidat penjadwalan), sebagian kecil
+    # (fixed_share) sudah punya jadwal yang sedang berjalan
+    rng = np.random.default_rng(seed)
+    station_lat, station_lon, slot_count = station_locations(rng, n_station, csv_path)
+
+    # Baterai di slot stasiun: minimal 70%, seperti BatterySwapStation di simulasi
+    station_list = [
+        [[int(rng.integers(70, 101)), int(rng.integers(50, 801))] for _ in range(count)]
+        for count in slot_count
+    ]
+
+    lat, lon = ev_locations(rng, n_ev)
+    low = rng.random(n_ev) < low_battery_share
+    battery_now = np.where(low, rng.integers(5, swap_threshold + 1, n_ev), rng.integers(swap_threshold + 1, 101, n_ev))
+    battery_cycle = rng.integers(50, 801, n_ev)
+    fixed = low & (rng.random(n_ev) < fixed_share)
+
+    ev = {}
+    for ev_id in range(n_ev):
+        ev[ev_id] = {
+            'battery_now': int(battery_now[ev_id]),
+            'battery_cycle': int(battery_cycle[ev_id]),
+            'energy_distance': [],
+            'travel_time': [],
+            'swap_schedule': {},
+        }
+
+    # Hanya kandidat yang diberi jarak, ke 8 stasiun terdekat (estimasi haversine 25 km/jam),
+    # dihitung per blok supaya memori tetap kecil untuk 20.000 EV x 500 stasiun
+    candidates = np.flatnonzero(low)
+    k = min(NEAREST_STATIONS, n_station)
+    for start in range(0, len(candidates), 2048):
+        block = candidates[start:start + 2048]
+        distance = haversine_km(lat[block, None], lon[block, None], station_lat[None, :], station_lon[None, :])
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        for row, ev_id in enumerate(block):
+            data = ev[int(ev_id)]
+            d = distance[row, nearest[row]]
+            if fixed[ev_id]:
+                # Jadwal berjalan di stasiun terdekat, tanpa energy_distance / travel_time lagi
+                station_idx = int(nearest[row][np.argmin(d)])
+                travel_time = float(d.min() / 25 * 60)
+                data['swap_schedule'] = {
+                    'assigned': True,
+                    'swap_id': int(ev_id),
+                    'battery_now': data['battery_now'],
+                    'battery_cycle': data['battery_cycle'],
+                    'battery_station': station_idx,
+                    'slot': int(rng.integers(0, slot_count[station_idx])),
+                    'energy_distance': round(float(d.min() * (100 / 65)), 2),
+                    'travel_time': round(travel_time, 2),
+                    'waiting_time': round(float(rng.uniform(0, 10)), 2),
+                    'exchanged_battery': round(float(data['battery_now'] - d.min() * (100 / 65)), 2),
+                    'received_battery': 80.0,
+                    'exchanged_battery_cycle': data['battery_cycle'],
+                    'received_battery_cycle': data['battery_cycle'] + 0.8,
+                    'status': 'on going',
+                    'scheduled_time': None,
+                }
+                continue
+            energy_distance = np.full(n_station, 99999.0)
+            travel_time = np.full(n_station, 99999.0)
+            energy_distance[nearest[row]] = np.round(d * (100 / 65), 2)
+            travel_time[nearest[row]] = np.round(d / 25 * 60, 2)
+            data['energy_distance'] = energy_distance.tolist()
+            data['travel_time'] = travel_time.tolist()
+
+    return station_list, ev
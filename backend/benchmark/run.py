@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from problem_solving_agent.engines import ENGINES, solve
+from .generator import generate_instance
+
+# Dijalankan dari folder backend:
+#   python -m benchmark.run --sizes 100x81 2000x81 20000x500 --time-budget-ms 5000 --output results.json
+#   python -m benchmark.run ... --baseline baseline.json
+
+DEFAULT_SIZES = ['100x81', '2000x81', '5000x200', '20000x500']
+
+# Opsi tambahan per engine agar semua engine memakai budget yang sebanding
+ENGINE_OPTIONS = {
+    'sa': {'batch_size': 8},
+}
+
+
+def parse_size(size):
+    n_ev, n_station = size.lower().split('x')
+    return int(n_ev), int(n_station)
+
+
+def count_iterations(info):
+    # history skor per iterasi, atau statistik per rantai/cluster yang punya 'iterations'
+    if info and isinstance(info[0], dict):
+        return sum(stats.get('iterations', 0) for stats in info)
+    return len(info)
+
+
+def peak_memory_mb():
+    # ru_maxrss dalam KB di Linux (byte di macOS), termasuk proses worker yang sudah selesai
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return usage / scale
+
+
+def run_case(case):
+    # Satu kombinasi engine x ukuran, dijalankan di proses sendiri supaya peak memory terpisah
+    start = time.perf_counter()
+    battery_swap_station, ev = generate_instance(case['n_ev'], case['n_station'], seed=case['seed'])
+    generation_time = time.perf_counter() - start
+
+    options = dict(ENGINE_OPTIONS.get(case['engine'], {}))
+    options.update(
+        required_battery_threshold=80,
+        max_iter=case['max_iter'],
+        time_budget_ms=case['time_budget_ms'],
+    )
+
+    scores, latencies, iterations = [], [], []
+    for repeat in range(case['repeats']):
+        random.seed(case['seed'] + repeat)
+        start = time.perf_counter()
+        solution, score, info = solve(case['engine'], battery_swap_station, ev, 15, 100 / 240, **options)
+        latencies.append(time.perf_counter() - start)
+        scores.append(float(score))
+        iterations.append(count_iterations(info))
+
+    latency_ms = np.array(latencies) * 1000
+    return dict(
+        case,
+        n_candidate=int(solution.instance.candidate.sum()),
+        generation_time=generation_time,
+        scores=scores,
+        score_mean=float(np.mean(scores)),
+        score_best=float(np.max(scores)),
+        iterations=iterations,
+        iterations_per_second=float(np.sum(iterations) / np.sum(latencies)),
+        latency_ms={
+            'p50': float(np.percentile(latency_ms, 50)),
+            'p90': float(np.percentile(latency_ms, 90)),
+            'p99': float(np.percentile(latency_ms, 99)),
+            'max': float(latency_ms.max()),
+        },
+        peak_memory_mb=peak_memory_mb(),
+    )
+
+
+def run_isolated(case):
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmark.run', '--case', json.dumps(case)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return dict(case, error=result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def case_key(result):
+    return (result['engine'], result['n_ev'], result['n_station'], result['time_budget_ms'], result['max_iter'])
+
+
+def compare(results, baseline, tolerance):
+    # Regresi: skor rata-rata turun atau latensi p50 naik lebih dari tolerance (relatif)
+    base = {case_key(case): case for case in baseline['cases'] if 'error' not in case}
+    regressions = []
+    for case in results['cases']:
+        old = base.get(case_key(case))
+        if old is None or 'error' in case:
+            continue
+        score_drop = (old['score_mean'] - case['score_mean']) / max(abs(old['score_mean']), 1e-9)
+        latency_rise = case['latency_ms']['p50'] / max(old['latency_ms']['p50'], 1e-9) - 1
+        regressed = score_drop > tolerance or latency_rise > tolerance
+        print(
+            f"{case['engine']:>14} {case['n_ev']:>6}x{case['n_station']:<4} "
+            f"score {old['score_mean']:12.1f} -> {case['score_mean']:12.1f} "
+            f"p50 {old['latency_ms']['p50']:9.1f} -> {case['latency_ms']['p50']:9.1f} ms"
+            + ('  REGRESSION' if regressed else '')
+        )
+        if regressed:
+            regressions.append(case_key(case))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark semua engine penjadwalan pada instance sintetis Jakarta')
+    parser.add_argument('--engines', nargs='+', default=sorted(ENGINES), help='nama engine di registry')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help='jumlah EV x jumlah stasiun, misal 2000x81')
+    parser.add_argument('--time-budget-ms', type=float, default=5000)
+    parser.add_argument('--max-iter', type=int, default=None)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='hasil sebelumnya untuk dibandingkan')
+    parser.add_argument('--tolerance', type=float, default=0.05)
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return 0
+
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'cases': [],
+    }
+    for size in args.sizes:
+        n_ev, n_station = parse_size(size)
+        for engine in args.engines:
+            case = {
+                'engine': engine, 'n_ev': n_ev, 'n_station': n_station, 'seed': args.seed,
+                'time_budget_ms': args.time_budget_ms, 'max_iter': args.max_iter, 'repeats': args.repeats,
+            }
+            result = run_isolated(case)
+            results['cases'].append(result)
+            if 'error' in result:
+                print(f"{engine:>14} {size:>10}  ERROR {result['error']}")
+            else:
+                print(
+                    f"{engine:>14} {size:>10}  score {result['score_mean']:12.1f}  "
+                    f"it/s {result['iterations_per_second']:8.1f}  p50 {result['latency_ms']['p50']:9.1f} ms  "
+                    f"mem {result['peak_memory_mb']:7.1f} MB"
+                )
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,20 @@
+# Paket solver bersama: Instance/Solution, konfigurasi objektif, dan registry engine.
+# Nama di bawah diimpor saat pertama dipakai, supaya modul ringan (route_cache, routing_client,
+# geo) bisa diimpor simulasi tanpa ikut memuat semua engine solver
+import importlib
+
+_EXPORTS = {
+    'ENGINES': 'engines', 'get_engine': 'engines', 'register_engine': 'engines', 'solve': 'engines',
+    'DEFAULT_OBJECTIVE': 'evaluation', 'ObjectiveConfig': 'evaluation',
+    'Instance': 'solution', 'Solution': 'solution',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
@@ -1,9 +1,16 @@
-import copy
+import itertools
 import random
 import math
-from .evaluation import evaluate
+import numpy as np
+from .budget import SearchBudget
+from .insertion import regret_insertion
+from .operator_selection import make_selector, REWARD_NEW_BEST, REWARD_REJECTED
+from .profiler import NullProfiler
+from .constructive import INITIALIZERS
 from .random_initialization import random_initialization
-from .utils import get_neighbor_simulated_annealing, queue_update
+from .solution import Instance
+from .utils import get_neighbor_simulated_annealing, sample_neighbor_moves
+from .warm_start import warm_start_initialization
 
 def simulated_annealing(
     battery_swap_station,
@@ -13,169 +20,188 @@ def simulated_annealing(
     initial_temp=100.0,
     alpha=0.95,
     T_min=0.001,
-    max_iter=200
+    max_iter=200,
+    required_battery_threshold=80,
+    delta_evaluation=True,
+    time_budget_ms=None,
+    stagnation_limit=None,
+    callback=None,
+    batch_size=1,
+    batch_pick='best',
+    profiler=None,
+    score_cache=None,
+    initialization='greedy',
+    objective=None,
+    previous_schedule=None
 ):
-    current_ev = copy.deepcopy(ev)
-    current_solution = random_initialization(battery_swap_station, current_ev, threshold, charging_rate)
-    current_score = evaluate(current_solution)
+    # initialization: nama solusi awal di INITIALIZERS ('random', 'greedy', 'assignment'),
+    # diabaikan jika ada previous_schedule (warm start).
+    # score_cache (mode batch): solusi yang sudah dikunjungi menjadi memori tabu,
+    # kandidat yang kembali ke sana tidak dinilai
+    profiler = profiler or NullProfiler()
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+    with profiler.phase('initialization'):
+        instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+        if previous_schedule:
+            current_solution = warm_start_initialization(instance, previous_schedule)
+        else:
+            current_solution = INITIALIZERS[initialization](instance)
+    if score_cache is not None:
+        score_cache.put(current_solution.fingerprint, current_solution.score)
+    current_score = current_solution.score
 
-    best_solution = copy.deepcopy(current_solution)
+    best_solution = current_solution.copy()
     best_score = current_score
+    profiler.best(best_score)
+    history = []
 
     T = initial_temp
-    for iteration in range(max_iter):
-        if T < T_min:
+    for iteration in itertools.count():
+        if T < T_min or budget.exhausted(iteration):
             break
 
-        new_solution = get_neighbor_simulated_annealing(current_solution, ev, battery_swap_station, charging_rate, threshold=15, required_battery_threshold=80)
-        new_score = evaluate(new_solution)
-        delta = new_score - current_score
-
-        if delta > 0 or random.random() < math.exp(delta / T):
-            current_solution = new_solution
-            current_score = new_score
-            if new_score > best_score:
-                best_solution = new_solution
-                best_score = new_score
+        accepted = annealing_step(
+            current_solution, instance, T, delta_evaluation, batch_size, batch_pick, profiler, score_cache
+        )
+        profiler.iteration(accepted)
+
+        if accepted:
+            current_score = current_solution.score
+            if current_score > best_score:
+                with profiler.phase('copy'):
+                    best_solution = current_solution.copy()
+                best_score = current_score
+                profiler.best(best_score)
+                budget.record(improved=True)
+            else:
+                budget.record(improved=False)
+        else:
+            budget.record(improved=False)
 
+        if callback:
+            callback(iteration, best_score, current_score)
+        history.append(best_score)
         T *= alpha
 
-    return best_solution, best_score
-
-def random_destroy(solution, ev, destroy_ratio=0.1):
-    destroyed = copy.deepcopy(solution)
-    keys = [k for k in destroyed if destroyed[k].get("assigned") and not ev[k].get("swap_schedule")]
+    if score_cache is not None:
+        profiler.record_cache(score_cache.stats())
+    profiler.finish(budget.stop_reason or 'temperature')
+    return best_solution, best_score, history
+
+def annealing_step(solution, instance, T, delta_evaluation=True, batch_size=1, batch_pick='best', profiler=None, tabu=None):
+    # Satu langkah Metropolis pada suhu T, solution diubah langsung jika diterima
+    profiler = profiler or NullProfiler()
+    if batch_size > 1:
+        # K kandidat dinilai sekaligus, hanya kandidat terpilih yang diterapkan
+        return batched_neighbor_step(solution, instance, T, batch_size, batch_pick, profiler, tabu)
+
+    score = solution.score
+    solution.begin()
+    with profiler.phase('queue_update'):
+        get_neighbor_simulated_annealing(solution, instance, delta_evaluation)
+    delta = solution.score - score
+    accepted = delta > 0 or random.random() < math.exp(delta / T)
+    if accepted:
+        solution.commit()
+    else:
+        with profiler.phase('rollback'):
+            solution.rollback()
+    return accepted
+
+def batched_neighbor_step(solution, instance, T, batch_size, batch_pick='best', profiler=None, tabu=None):
+    # Metropolis pada kandidat terbaik ('best') atau kandidat yang disampel sebanding
+    # exp(delta / T) ('sample'), delta semua kandidat dihitung dari timeline slot.
+    # tabu: ScoreCache solusi yang sudah dikunjungi, kandidat yang kembali ke sana dibuang
+    profiler = profiler or NullProfiler()
+    moves = sample_neighbor_moves(solution, instance, batch_size)
+    if tabu is not None:
+        moves = [(pos, g) for pos, g in moves if tabu.get(solution.move_fingerprint(pos, g)) is None]
+
+    if not moves:
+        return False
+
+    with profiler.phase('evaluate'):
+        deltas = solution.move_deltas(moves)
+    if batch_pick == 'sample':
+        weights = np.exp((deltas - deltas.max()) / T)
+        idx = random.choices(range(len(moves)), weights=weights)[0]
+    else:
+        idx = int(np.argmax(deltas))
+
+    delta = deltas[idx]
+    if delta > 0 or random.random() < math.exp(delta / T):
+        pos, g = moves[idx]
+        with profiler.phase('queue_update'):
+            solution.move(pos, *instance.slot_key(g))
+            solution.update_queues()
+        if tabu is not None:
+            tabu.put(solution.fingerprint, solution.score)
+        return True
+    return False
+
+def random_destroy(solution, destroy_ratio=0.1):
+    # Hanya memilih EV yang akan dipindah, solution diubah langsung oleh repair
+    keys = list(solution.movable())
 
     if not keys:
-        return destroyed, []  # tidak ada yang bisa didestroy
+        return []  # tidak ada yang bisa didestroy
 
     upper_bound = max(1, int(len(keys) * destroy_ratio))
     num_remove = random.randint(1, upper_bound)  # jumlah yang didestroy dipilih acak
     to_remove = random.sample(keys, num_remove)
 
-    return destroyed, to_remove
+    return to_remove
 
-def destroy_high_waiting_time(solution, ev, destroy_ratio=0.1):
-    destroyed = copy.deepcopy(solution)
-    
+def destroy_high_waiting_time(solution, destroy_ratio=0.1):
     # Ambil EV yang assigned dan bukan jadwal tetap
-    keys = [
-        k for k in destroyed 
-        if destroyed[k].get("assigned") 
-        and not ev[k].get("swap_schedule") 
-        and destroyed[k].get("waiting_time") is not None
-    ]
+    keys = list(solution.movable())
 
     if not keys:
-        return destroyed, []
+        return []
 
     # Urutkan keys berdasarkan waiting_time
-    sorted_keys = sorted(keys, key=lambda k: destroyed[k]["waiting_time"], reverse=True)
+    sorted_keys = sorted(keys, key=lambda k: solution.waiting_time[k], reverse=True)
 
     upper_bound = max(1, int(len(sorted_keys)))
     num_remove = random.randint(1, upper_bound)  # jumlah yang didestroy dipilih acak
     to_remove = sorted_keys[:num_remove]  # Ambil waiting_time terbesar
 
-    return destroyed, to_remove
-
-def random_repair(solution, ev, battery_swap_station, charging_rate, required_battery_threshold, to_remove):
-    for target_ev in to_remove:
-        data = ev[target_ev]
-
-        valid_options = []
-        for station_idx, (ed, tt) in enumerate(zip(data['energy_distance'], data['travel_time'])):
-            if (data['battery_now'] * (100 - data['battery_cycle'] * 0.025)/100) - ed < 0:
-                continue
-            for slot_idx in range(len(battery_swap_station[station_idx])):
-                valid_options.append((station_idx, slot_idx, ed, tt))
-        if valid_options:
-            station_idx, slot_idx, ed, tt = random.choice(valid_options)
-
-            actual_percentage = 1 - (0.00025 * data['battery_cycle'])
-            degradation_factor = 1 / actual_percentage
-            exchanged_battery = data['battery_now'] - ed * degradation_factor
-            solution[target_ev] = {
-                'assigned': True,
-                'swap_id': None,
-                'battery_now': data['battery_now'],
-                'battery_cycle': data['battery_cycle'],
-                'battery_station': station_idx,
-                'slot': slot_idx,
-                'energy_distance': ed,
-                'travel_time': tt,
-                'waiting_time': 0,  # akan diupdate
-                'exchanged_battery': exchanged_battery,
-                'received_battery': 0,  # akan diupdate
-                'exchanged_battery_cycle': data['battery_cycle'],
-                'received_battery_cycle': 0, # akan diupdate
-                'status': 'on going',
-                'scheduled_time': None,
-            }
-
-    return queue_update(solution, ev, battery_swap_station, charging_rate, required_battery_threshold)
-
-def available_repair(solution, ev, battery_swap_station, charging_rate, required_battery_threshold, to_remove):
-    # Ambil semua slot (station, slot) yang sudah dipakai dalam solution yang assigned
-    used_slots = set(
-        (sched['battery_station'], sched['slot'])
-        for ev_id, sched in solution.items()
-        if sched.get("assigned") and sched['battery_station'] is not None and sched['slot'] is not None
-    )
+    return to_remove
+
+def random_repair(solution, instance, to_remove):
+    for pos in to_remove:
+        # Opsi (station, slot) valid sudah diindeks sekali per solve
+        options = instance.options(pos)
+
+        if len(options):
+            g = options[random.randrange(len(options))]
+            solution.move(pos, *instance.slot_key(g))
+
+    return solution
+
+def available_repair(solution, instance, to_remove):
+    # Tandai semua slot (station, slot) yang sudah dipakai dalam solution yang assigned
+    used_slots = np.zeros(instance.n_slot, dtype=bool)
+    used = solution.assigned & (solution.station >= 0)
+    used_slots[instance.slot_offset[solution.station[used]] + solution.slot[used]] = True
+
+    for pos in to_remove:
+        options = instance.options(pos)
+        options = options[~used_slots[options]]
+
+        if len(options):
+            g = options[random.randrange(len(options))]
+            solution.move(pos, *instance.slot_key(g))
+            used_slots[g] = True  # Tandai slot sebagai terpakai
 
-    for target_ev in to_remove:
-        data = ev[target_ev]
-        valid_options = []
-
-        for station_idx, (ed, tt) in enumerate(zip(data['energy_distance'], data['travel_time'])):
-            if (data['battery_now'] * (100 - data['battery_cycle'] * 0.025)/100) - ed < 0:
-                continue
-            for slot_idx in range(len(battery_swap_station[station_idx])):
-                key = (station_idx, slot_idx)
-                if key not in used_slots:
-                    valid_options.append((station_idx, slot_idx, ed, tt))
-
-        if valid_options:
-            station_idx, slot_idx, ed, tt = random.choice(valid_options)
-
-            actual_percentage = 1 - (0.00025 * data['battery_cycle'])
-            degradation_factor = 1 / actual_percentage
-            exchanged_battery = data['battery_now'] - ed * degradation_factor
-            solution[target_ev] = {
-                'assigned': True,
-                'swap_id': None,
-                'battery_now': data['battery_now'],
-                'battery_cycle': data['battery_cycle'],
-                'battery_station': station_idx,
-                'slot': slot_idx,
-                'energy_distance': ed,
-                'travel_time': tt,
-                'waiting_time': 0,  # akan diupdate
-                'exchanged_battery': exchanged_battery,
-                'received_battery': 0,  # akan diupdate
-                'exchanged_battery_cycle': data['battery_cycle'],
-                'received_battery_cycle': 0, # akan diupdate
-                'status': 'on going',
-                'scheduled_time': None,
-            }
-            used_slots.add((station_idx, slot_idx))  # Tandai slot sebagai terpakai
-
-    return queue_update(solution, ev, battery_swap_station, charging_rate, required_battery_threshold)
-
-
-def roulette_select(weights):
-    total = sum(weights)
-    r = random.uniform(0, total)
-    upto = 0
-    for i, w in enumerate(weights):
-        if upto + w >= r:
-            return i
-        upto += w
-    return len(weights) - 1
-
-
-def normalize_scores(scores):
-    total = sum(scores)
-    return [s / total if total > 0 else 1.0 for s in scores]
+    return solution
+
+def greedy_repair(solution, instance, to_remove):
+    # Setiap EV ke slot dengan skor sisip terbaik, yang termurah disisipkan lebih dulu
+    return regret_insertion(solution, instance, to_remove, k=1)
+
+def regret_repair(solution, instance, to_remove):
+    return regret_insertion(solution, instance, to_remove, k=2)
 
 
 def alns_ev_scheduler(
@@ -184,49 +210,134 @@ def alns_ev_scheduler(
     threshold,
     charging_rate,
     required_battery_threshold=80,
-    max_iter=1000
+    max_iter=1000,
+    delta_evaluation=True,
+    operator_selection='roulette',
+    time_budget_ms=None,
+    stagnation_limit=None,
+    callback=None,
+    previous_schedule=None,
+    profiler=None,
+    score_cache=None,
+    initialization='random',
+    objective=None
 ):
-    current = random_initialization(battery_swap_station, ev, threshold, charging_rate, required_battery_threshold)
-    best = copy.deepcopy(current)
-    best_score = evaluate(best)
+    profiler = profiler or NullProfiler()
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+    with profiler.phase('initialization'):
+        instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+
+        # Warm start dari jadwal ronde sebelumnya jika ada, jika tidak dari initialization
+        if previous_schedule:
+            initial_solution = warm_start_initialization(instance, previous_schedule)
+        else:
+            initial_solution = INITIALIZERS[initialization](instance)
 
-    destroy_ops = [random_destroy, destroy_high_waiting_time]
-    repair_ops = [random_repair, available_repair]
-    destroy_weights = [1.0]
-    repair_weights = [1.0]
+    return alns_search(
+        instance, delta_evaluation=delta_evaluation, operator_selection=operator_selection,
+        budget=budget, callback=callback, initial_solution=initial_solution, profiler=profiler,
+        score_cache=score_cache
+    )
 
-    destroy_scores = [0.0 for _ in destroy_ops]
-    repair_scores = [0.0 for _ in repair_ops]
-    history = []
 
-    for it in range(max_iter):
-        destroy_idx = roulette_select(destroy_weights)
-        repair_idx = roulette_select(repair_weights)
+def alns_search(
+    instance,
+    max_iter=1000,
+    delta_evaluation=True,
+    operator_selection='roulette',
+    segment_length=50,
+    time_budget_ms=None,
+    stagnation_limit=None,
+    callback=None,
+    budget=None,
+    initial_solution=None,
+    profiler=None,
+    score_cache=None
+):
+    # Inti ALNS di atas Instance yang sudah dibangun (dipakai juga oleh multi-start paralel).
+    # Berhenti saat max_iter, time_budget_ms, atau stagnation_limit tercapai dan
+    # mengembalikan solusi terbaik sejauh ini. score_cache (ScoreCache) melewati evaluasi
+    # assignment yang pernah dinilai
+    profiler = profiler or NullProfiler()
+    if budget is None:
+        budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+    with profiler.phase('initialization'):
+        if initial_solution is not None:
+            current = initial_solution.copy()
+        else:
+            current = random_initialization(instance)
+        best = current.copy()
+    best_score = current.score
+    profiler.best(best_score)
+    if score_cache is not None:
+        score_cache.put(current.fingerprint, best_score)
+
+    destroy_ops = [random_destroy, destroy_high_waiting_time]
+    repair_ops = [random_repair, available_repair, greedy_repair, regret_repair]
 
-        destroyed, to_remove = destroy_ops[destroy_idx](current, ev)
+    # Pemilihan operator adaptif: roulette dengan bobot per segmen, atau UCB1
+    destroy_selector = make_selector(operator_selection, len(destroy_ops))
+    repair_selector = make_selector(operator_selection, len(repair_ops))
+    history = []
 
-        repaired = repair_ops[repair_idx](destroyed, ev, battery_swap_station, charging_rate, required_battery_threshold, to_remove)
+    for it in itertools.count():
+        if budget.exhausted(it):
+            break
 
-        score = evaluate(repaired)
+        destroy_idx = destroy_selector.select()
+        repair_idx = repair_selector.select()
+
+        # Solusi kerja diubah langsung, perubahan dicatat agar bisa dibatalkan
+        current.begin()
+        with profiler.phase('destroy'):
+            to_remove = destroy_ops[destroy_idx](current)
+        with profiler.phase('repair'):
+            repair_ops[repair_idx](current, instance, to_remove)
+
+        # Assignment yang pernah dinilai tidak pernah lebih baik dari best, langsung ditolak
+        score = None
+        if score_cache is not None:
+            score = score_cache.get(current.fingerprint)
+            if score is not None and score > best_score:
+                score = None  # cache dari instance lain, hitung ulang
+        if score is None:
+            # Delta: hanya slot yang tersentuh destroy/repair yang dihitung ulang
+            with profiler.phase('queue_update'):
+                if delta_evaluation:
+                    score = current.update_queues()
+                else:
+                    score = current.refresh()
+            if score_cache is not None:
+                score_cache.put(current.fingerprint, score)
 
         if score > best_score:
-            best = copy.deepcopy(repaired)
+            current.commit()
+            with profiler.phase('copy'):
+                best = current.copy()
             best_score = score
-            destroy_scores[destroy_idx] += 1
-            repair_scores[repair_idx] += 1
-
-            current = copy.deepcopy(best)
+            profiler.best(best_score)
+            reward = REWARD_NEW_BEST
         else:
-            destroy_scores[destroy_idx] -= 1
-            repair_scores[repair_idx] -= 1
+            with profiler.phase('rollback'):
+                current.rollback()
+            reward = REWARD_REJECTED
+        budget.record(improved=reward == REWARD_NEW_BEST)
+        profiler.iteration(reward == REWARD_NEW_BEST)
+
+        destroy_selector.update(destroy_idx, reward)
+        repair_selector.update(repair_idx, reward)
 
-        if (it + 1) % 50 == 0:
-            destroy_weights = [1.0]
-            repair_weights = [1.0]
-            destroy_scores = [0.0 for _ in destroy_ops]
-            repair_scores = [0.0 for _ in repair_ops]
+        if (it + 1) % segment_length == 0:
+            destroy_selector.end_segment()
+            repair_selector.end_segment()
 
-        print(f"[{it}] Best score: {best_score}")
+        if callback:
+            callback(it, best_score, score)
         history.append(best_score)
 
-    return best, best_score, history
+    profiler.record_operators('destroy', destroy_ops, destroy_selector)
+    profiler.record_operators('repair', repair_ops, repair_selector)
+    if score_cache is not None:
+        profiler.record_cache(score_cache.stats())
+    profiler.finish(budget.stop_reason)
+    return best, best_score, history
\ No newline at end of file
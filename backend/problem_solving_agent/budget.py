@@ -0,0 +1,27 @@
+import time
+
+
+class SearchBudget:
+    # Batas pencarian mode anytime: jumlah iterasi, waktu (ms), dan iterasi tanpa perbaikan
+    def __init__(self, max_iter=None, time_budget_ms=None, stagnation_limit=None):
+        self.max_iter = max_iter
+        self.stagnation_limit = stagnation_limit
+        self.start = time.perf_counter()
+        self.deadline = None if time_budget_ms is None else self.start + time_budget_ms / 1000
+        self.stagnation = 0
+        self.stop_reason = None
+
+    def record(self, improved):
+        self.stagnation = 0 if improved else self.stagnation + 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def exhausted(self, iteration):
+        if self.max_iter is not None and iteration >= self.max_iter:
+            self.stop_reason = 'max_iter'
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stop_reason = 'time_budget'
+        elif self.stagnation_limit is not None and self.stagnation >= self.stagnation_limit:
+            self.stop_reason = 'stagnation'
+        return self.stop_reason is not None
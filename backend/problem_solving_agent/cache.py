@@ -0,0 +1,45 @@
+from collections import OrderedDict
+
+
+class ScoreCache:
+    # LRU terbatas: fingerprint assignment (Zobrist) -> skor. Karena menyimpan solusi yang
+    # baru dikunjungi, cache yang sama bisa dipakai sebagai memori tabu
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self.entries
+
+    def get(self, fingerprint):
+        score = self.entries.get(fingerprint)
+        if score is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(fingerprint)
+        self.hits += 1
+        return score
+
+    def put(self, fingerprint, score):
+        self.entries[fingerprint] = score
+        self.entries.move_to_end(fingerprint)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,125 @@
+import heapq
+import numpy as np
+from .evaluation import swap_score
+from .random_initialization import random_initialization
+from .solution import Solution
+from .timeline import handover_arrays
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy opsional, tanpa scipy dipakai pencocokan greedy
+    linear_sum_assignment = None
+
+
+def slot_tails(instance):
+    # Kondisi ujung antrian tiap slot global (waktu baterai terakhir masuk, level, cycle)
+    ready_time, battery, cycle = (np.array(column, dtype=np.float64) for column in zip(*instance.slot_base))
+    return ready_time, battery, cycle
+
+
+def handover_scores(instance, pos, slots, tails):
+    # Skor EV pos jika ditaruh di ujung antrian tiap slot dalam slots
+    ready_time, battery, cycle = (column[slots] for column in tails)
+    stations = instance.slot_station[slots]
+    arrival_time = instance.travel_time[pos, stations]
+    waiting_time, received_battery, received_battery_cycle = handover_arrays(
+        ready_time, battery, cycle, arrival_time, instance.charging_rate, instance.required_battery_threshold
+    )
+    # Dibulatkan seperti nilai yang disimpan di Solution
+    scores = swap_score(
+        np.round(received_battery, 2), np.round(received_battery_cycle, 2),
+        instance.exchanged_battery[pos, stations], instance.battery_cycle[pos], np.round(waiting_time, 2), instance.objective
+    )
+    return scores, arrival_time + waiting_time
+
+
+def _append(solution, instance, pos, g, end_time, tails):
+    ready_time, battery, cycle = tails
+    ready_time[g] = end_time
+    battery[g] = instance.exchanged_battery[pos, instance.slot_station[g]]
+    cycle[g] = instance.battery_cycle[pos]
+    solution.move(pos, *instance.slot_key(g))
+
+
+def _greedy_fill(solution, instance, positions, tails):
+    # EV diambil dari priority queue urut waktu tiba paling awal, lalu ditaruh di ujung
+    # antrian slot dengan skor swap terbesar (gain baterai dikurangi waiting time)
+    events = []
+    for pos in positions:
+        options = instance.options(pos)
+        if len(options):
+            arrival_time = instance.travel_time[pos, instance.slot_station[options]].min()
+            events.append((arrival_time, instance.id_rank[pos], int(pos)))
+    heapq.heapify(events)
+
+    while events:
+        _, _, pos = heapq.heappop(events)
+        options = instance.options(pos)
+        scores, end_time = handover_scores(instance, pos, options, tails)
+        best = int(np.argmax(scores))
+        _append(solution, instance, pos, int(options[best]), end_time[best], tails)
+
+
+def greedy_initialization(instance):
+    # Konstruktif: EV dijadwalkan satu per satu sesuai urutan tiba
+    solution = Solution(instance)
+    _greedy_fill(solution, instance, np.flatnonzero(instance.candidate), slot_tails(instance))
+    solution.refresh()
+    return solution
+
+
+def _match(gain):
+    # Pasangan (baris, kolom) dengan total gain maksimum, paling banyak satu per baris/kolom
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(gain, maximize=True)
+    # Tanpa scipy: ambil pasangan bergain terbesar lebih dulu selama baris dan kolomnya kosong
+    rows, cols = [], []
+    used_row = np.zeros(gain.shape[0], dtype=bool)
+    used_col = np.zeros(gain.shape[1], dtype=bool)
+    for flat in np.argsort(gain, axis=None, kind='stable')[::-1]:
+        i, j = divmod(int(flat), gain.shape[1])
+        if used_row[i] or used_col[j]:
+            continue
+        used_row[i] = used_col[j] = True
+        rows.append(i)
+        cols.append(j)
+        if len(rows) == min(gain.shape):
+            break
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
+def assignment_initialization(instance):
+    # Min-cost assignment tanpa antrian: tiap slot menerima paling banyak satu EV pada ronde
+    # pertama, dipilih bersama lewat pencocokan. EV yang tersisa (EV lebih banyak dari slot)
+    # disisipkan greedy di belakang antrian
+    solution = Solution(instance)
+    tails = slot_tails(instance)
+    candidates = np.flatnonzero(instance.candidate)
+
+    infeasible = -1e9
+    gain = np.full((len(candidates), instance.n_slot), infeasible)
+    end_times = np.zeros_like(gain)
+    for row, pos in enumerate(candidates):
+        options = instance.options(pos)
+        if len(options):
+            gain[row, options], end_times[row, options] = handover_scores(instance, pos, options, tails)
+
+    assigned = set()
+    rows, cols = _match(gain) if gain.size else ([], [])
+    for row, g in zip(rows, cols):
+        if gain[row, g] > infeasible:
+            _append(solution, instance, candidates[row], int(g), end_times[row, g], tails)
+            assigned.add(row)
+
+    rest = [pos for row, pos in enumerate(candidates) if row not in assigned]
+    _greedy_fill(solution, instance, rest, tails)
+    solution.refresh()
+    return solution
+
+
+# Pilihan solusi awal untuk solver, berdasarkan nama
+INITIALIZERS = {
+    'random': random_initialization,
+    'greedy': greedy_initialization,
+    'assignment': assignment_initialization,
+}
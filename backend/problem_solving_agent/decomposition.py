@@ -0,0 +1,205 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .algorithm import alns_search
+from .budget import SearchBudget
+from .insertion import regret_insertion
+from .solution import Instance, Solution
+from .warm_start import warm_start_initialization
+
+
+def station_coupling(instance):
+    # Bobot antar stasiun = jumlah EV kandidat yang bisa menjangkau keduanya
+    reach = (instance.feasible & instance.candidate[:, None]).astype(np.float64)
+    return reach.T @ reach
+
+
+def connected_components(weights):
+    n = len(weights)
+    labels = np.full(n, -1)
+    for start in range(n):
+        if labels[start] >= 0:
+            continue
+        labels[start] = start
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            for j in np.flatnonzero(weights[i] > 0):
+                if labels[j] < 0:
+                    labels[j] = start
+                    stack.append(j)
+    return [np.flatnonzero(labels == label) for label in np.unique(labels)]
+
+
+def spectral_split(weights, stations, max_cluster_stations):
+    # Bagi dua berdasarkan vektor Fiedler sampai ukuran cluster tidak melebihi batas,
+    # potongan jatuh di antara stasiun yang paling sedikit berbagi EV
+    if len(stations) <= max_cluster_stations:
+        return [stations]
+    sub = weights[np.ix_(stations, stations)].copy()
+    np.fill_diagonal(sub, 0)
+    laplacian = np.diag(sub.sum(axis=1)) - sub
+    _, vectors = np.linalg.eigh(laplacian)
+    order = np.argsort(vectors[:, 1], kind='stable')
+    half = len(stations) // 2
+    return (
+        spectral_split(weights, stations[np.sort(order[:half])], max_cluster_stations)
+        + spectral_split(weights, stations[np.sort(order[half:])], max_cluster_stations)
+    )
+
+
+def decompose(instance, max_cluster_stations=20):
+    # Cluster stasiun: komponen terhubung graf interaksi EV-stasiun, yang terlalu besar dibelah
+    weights = station_coupling(instance)
+    clusters = []
+    for component in connected_components(weights):
+        clusters.extend(spectral_split(weights, component, max_cluster_stations))
+    return clusters
+
+
+def cluster_ev_dict(instance, stations):
+    # EV kandidat yang stasiun terdekatnya ada di cluster, dibatasi ke stasiun cluster saja,
+    # ditambah jadwal tetap di stasiun cluster (mengisi ujung antrian slot)
+    in_cluster = np.zeros(instance.n_station, dtype=bool)
+    in_cluster[stations] = True
+
+    travel_time = np.where(instance.feasible, instance.travel_time, np.inf)
+    home = np.argmin(travel_time, axis=1)
+    has_option = instance.feasible.any(axis=1)
+    station_set = set(int(s) for s in stations)
+
+    sub_ev = {}
+    for pos, ev_id in enumerate(instance.ev_ids):
+        data = instance.ev[ev_id]
+        if instance.fixed[pos]:
+            if data['swap_schedule'].get('battery_station') in station_set:
+                sub_ev[ev_id] = data
+        elif instance.candidate[pos] and has_option[pos] and in_cluster[home[pos]]:
+            sub_ev[ev_id] = dict(
+                data,
+                energy_distance=np.where(in_cluster, instance.energy_distance[pos], 99999.0).tolist(),
+                travel_time=np.where(in_cluster, instance.travel_time[pos], 99999.0).tolist(),
+            )
+    return sub_ev
+
+
+def _solve_cluster(
+    battery_swap_station, sub_ev, stations, charging_rate, required_battery_threshold, seed,
+    max_iter, delta_evaluation, operator_selection, deadline, share_ms, stagnation_limit, previous_schedule,
+    objective
+):
+    random.seed(seed)
+    start = time.time()
+    time_budget_ms = None if deadline is None else max(0.0, min(share_ms, (deadline - start) * 1000))
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+
+    instance = Instance(battery_swap_station, sub_ev, charging_rate, required_battery_threshold, objective)
+    initial_solution = None
+    if previous_schedule:
+        initial_solution = warm_start_initialization(instance, previous_schedule)
+    best, best_score, history = alns_search(
+        instance, delta_evaluation=delta_evaluation, operator_selection=operator_selection,
+        budget=budget, initial_solution=initial_solution
+    )
+
+    # Kembalikan assignment per ev_id, Instance cluster tidak perlu dikirim balik
+    assignment = {
+        instance.ev_ids[pos]: (int(best.station[pos]), int(best.slot[pos]))
+        for pos in best.movable()
+    }
+    return {
+        'stations': [int(s) for s in stations],
+        'n_ev': int(instance.candidate.sum()),
+        'assignment': assignment,
+        'score': best_score,
+        'iterations': len(history),
+        'stop_reason': budget.stop_reason,
+        'execution_time': time.time() - start,
+    }
+
+
+def decomposition_alns(
+    battery_swap_station,
+    ev,
+    threshold,
+    charging_rate,
+    required_battery_threshold=80,
+    max_iter=1000,
+    max_cluster_stations=20,
+    max_workers=None,
+    seed=None,
+    delta_evaluation=True,
+    operator_selection='roulette',
+    time_budget_ms=None,
+    stagnation_limit=None,
+    previous_schedule=None,
+    objective=None
+):
+    # ALNS per cluster stasiun secara paralel, lalu EV perbatasan (yang bisa menjangkau
+    # lebih dari satu cluster) disisipkan ulang di solusi gabungan
+    deadline = None if time_budget_ms is None else time.time() + time_budget_ms / 1000
+    instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+    clusters = decompose(instance, max_cluster_stations)
+
+    # Cluster tanpa EV kandidat (hanya jadwal tetap atau kosong) tidak perlu dijalankan dan
+    # tidak ikut dihitung saat membagi worker dan budget waktu
+    active = []
+    for stations in clusters:
+        sub_ev = cluster_ev_dict(instance, stations)
+        if any(not data['swap_schedule'] for data in sub_ev.values()):
+            active.append((stations, sub_ev))
+
+    if not active:
+        # Tidak ada stasiun atau EV yang bisa dijadwalkan: kembalikan solusi awal
+        if previous_schedule:
+            best = warm_start_initialization(instance, previous_schedule)
+        else:
+            best = Solution(instance)
+        return best, best.refresh(), []
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(active))
+    # Jika cluster lebih banyak dari worker, budget waktu dibagi per gelombang
+    share_ms = None if time_budget_ms is None else time_budget_ms * max_workers / len(active)
+
+    rng = random.Random(seed)
+    jobs = []
+    for stations, sub_ev in active:
+        jobs.append((
+            battery_swap_station, sub_ev, stations, charging_rate, required_battery_threshold,
+            rng.randrange(2**32), max_iter, delta_evaluation, operator_selection, deadline,
+            share_ms, stagnation_limit, previous_schedule, objective
+        ))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_solve_cluster, *zip(*jobs)))
+
+    # Gabungkan assignment semua cluster ke solusi global
+    position = {ev_id: pos for pos, ev_id in enumerate(instance.ev_ids)}
+    station = np.full(instance.n_ev, -1, dtype=np.int32)
+    slot = np.full(instance.n_ev, -1, dtype=np.int32)
+    for result in results:
+        for ev_id, (station_idx, slot_idx) in result.pop('assignment').items():
+            station[position[ev_id]] = station_idx
+            slot[position[ev_id]] = slot_idx
+    best = Solution.from_assignment(instance, station, slot)
+
+    # Rekonsiliasi perbatasan: sisip ulang EV lintas cluster dengan semua opsinya
+    cluster_of = np.zeros(instance.n_station, dtype=np.int64)
+    for label, stations in enumerate(clusters):
+        cluster_of[stations] = label
+    border = [
+        pos for pos in best.movable()
+        if len(np.unique(cluster_of[instance.feasible[pos]])) > 1
+    ]
+    if border:
+        best.begin()
+        score_before = best.score
+        regret_insertion(best, instance, border)
+        if best.update_queues() > score_before:
+            best.commit()
+        else:
+            best.rollback()
+
+    return best, best.refresh(), results
@@ -0,0 +1,41 @@
+from .algorithm import alns_ev_scheduler, simulated_annealing
+from .decomposition import decomposition_alns
+from .metaheuristic import genetic_algorithm, grey_wolf_optimizer, iterated_greedy, path_relinking
+from .parallel import parallel_alns
+from .tempering import parallel_tempering
+
+# Registry engine penjadwalan. Semua engine dipanggil dengan
+# (battery_swap_station, ev, threshold, charging_rate, **options) dan menerima
+# required_battery_threshold, max_iter, time_budget_ms, previous_schedule, dan objective
+ENGINES = {}
+
+
+def register_engine(name, engine=None):
+    # Bisa dipakai langsung atau sebagai decorator
+    if engine is None:
+        return lambda fn: register_engine(name, fn)
+    ENGINES[name] = engine
+    return engine
+
+
+def get_engine(name):
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}', available: {', '.join(sorted(ENGINES))}")
+    return ENGINES[name]
+
+
+def solve(name, battery_swap_station, ev, threshold, charging_rate, **options):
+    # Semua engine mengembalikan (solution, score, info): info berisi history skor terbaik
+    # per iterasi, atau statistik per rantai/cluster untuk parallel_alns dan decomposition
+    return get_engine(name)(battery_swap_station, ev, threshold, charging_rate, **options)
+
+
+register_engine('alns', alns_ev_scheduler)
+register_engine('sa', simulated_annealing)
+register_engine('parallel_alns', parallel_alns)
+register_engine('decomposition', decomposition_alns)
+register_engine('tempering', parallel_tempering)
+register_engine('ga', genetic_algorithm)
+register_engine('gwo', grey_wolf_optimizer)
+register_engine('iga', iterated_greedy)
+register_engine('prec', path_relinking)
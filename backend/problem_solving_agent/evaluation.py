@@ -1,8 +1,59 @@
-def evaluate(battery_swap_schedule):
+import numpy as np
+
+class ObjectiveConfig:
+    # Bobot fungsi objektif dan ambang baterai EV kandidat, dipakai bersama oleh semua engine
+    def __init__(self, energy_gain_weight=0.2, waiting_time_weight=0.8, degradation_rate=0.00025, swap_threshold=25):
+        self.energy_gain_weight = energy_gain_weight
+        self.waiting_time_weight = waiting_time_weight
+        self.degradation_rate = degradation_rate
+        self.swap_threshold = swap_threshold  # EV dengan battery_now <= ambang ini dijadwalkan
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**(data or {}))
+
+    def to_dict(self):
+        return {
+            'energy_gain_weight': self.energy_gain_weight,
+            'waiting_time_weight': self.waiting_time_weight,
+            'degradation_rate': self.degradation_rate,
+            'swap_threshold': self.swap_threshold,
+        }
+
+DEFAULT_OBJECTIVE = ObjectiveConfig()
+
+def swap_score(received_battery, received_battery_cycle, exchanged_battery, exchanged_battery_cycle, waiting_time, objective=DEFAULT_OBJECTIVE):
+    # Kontribusi satu jadwal ke skor total (battery energy gain - waiting time)
+    rate = objective.degradation_rate
+    beg = (received_battery * (1 - rate * received_battery_cycle)) - (exchanged_battery * (1 - rate * exchanged_battery_cycle))
+    return (objective.energy_gain_weight * beg) - (objective.waiting_time_weight * waiting_time)
+
+def ev_score(sched, objective=DEFAULT_OBJECTIVE):
+    return swap_score(sched["received_battery"], sched["received_battery_cycle"], sched["exchanged_battery"], sched["exchanged_battery_cycle"], sched["waiting_time"], objective)
+
+def evaluate(battery_swap_schedule, objective=DEFAULT_OBJECTIVE):
     total_score = 0
     for ev_id, sched in battery_swap_schedule.items():
         if sched and sched.get("assigned"):
-            beg = (sched["received_battery"] * (1 - 0.00025 * sched["received_battery_cycle"])) - (sched["exchanged_battery"] * (1 - 0.00025 * sched["exchanged_battery_cycle"])) 
-            total_score = total_score + ((0.2 * beg) - (0.8 * sched["waiting_time"]))
+            total_score = total_score + ev_score(sched, objective)
+
+    return total_score
+
+def evaluate_arrays(assigned, received_battery, received_battery_cycle, exchanged_battery, exchanged_battery_cycle, waiting_time, objective=DEFAULT_OBJECTIVE):
+    # Array 1-D untuk satu solusi, atau 2-D (kandidat x EV) untuk satu skor per baris
+    scores = swap_score(received_battery, received_battery_cycle, exchanged_battery, exchanged_battery_cycle, waiting_time, objective)
+    return np.where(assigned, scores, 0.0).sum(axis=-1)
+
+def evaluate_solution(solution):
+    return float(evaluate_arrays(
+        solution.assigned,
+        solution.received_battery, solution.received_battery_cycle,
+        solution.exchanged_battery, solution.exchanged_battery_cycle,
+        solution.waiting_time, solution.instance.objective,
+    ))
 
-    return total_score
\ No newline at end of file
+def evaluate_batch(solutions):
+    # Skor banyak kandidat sekaligus (dari Instance yang sama), mengembalikan vektor skor
+    fields = ('assigned', 'received_battery', 'received_battery_cycle', 'exchanged_battery', 'exchanged_battery_cycle', 'waiting_time')
+    arrays = (np.stack([getattr(solution, name) for solution in solutions]) for name in fields)
+    return evaluate_arrays(*arrays, objective=solutions[0].instance.objective)
\ No newline at end of file
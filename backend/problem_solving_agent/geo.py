@@ -0,0 +1,138 @@
+import heapq
+import itertools
+import math
+import numpy as np
+
+
+def haversine_km(origin_lat, origin_lon, destination_lat, destination_lon):
+    # Jarak haversine (km) versi array, mengikuti aturan broadcasting numpy:
+    # origin (n, 1) dengan destination (1, m) menghasilkan matriks jarak (n, m)
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(c, dtype=np.float64)) for c in (origin_lat, origin_lon, destination_lat, destination_lon))
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return np.maximum(6371 * c, 0.000001)
+
+
+class GridIndex:
+    # Indeks spasial grid seragam di atas koordinat terproyeksi (km, equirectangular di
+    # sekitar ref_lat). Titik bisa dipindah dengan murah: hanya pindah sel jika melewati
+    # batas sel. Query k-nearest dan radius memakai jarak haversine
+    def __init__(self, cell_km=1.0, ref_lat=-6.2):
+        self.cell_km = cell_km
+        self.km_per_lon = 111.32 * math.cos(math.radians(ref_lat))
+        self.km_per_lat = 110.574
+        self.cells = {}
+        self.positions = {}
+        self.bounds = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def _cell(self, lat, lon):
+        return (
+            math.floor(lon * self.km_per_lon / self.cell_km),
+            math.floor(lat * self.km_per_lat / self.cell_km),
+        )
+
+    def update(self, key, lat, lon):
+        cell = self._cell(lat, lon)
+        old = self.positions.get(key)
+        if old is not None and old[2] != cell:
+            self._discard(key, old[2])
+        self.cells.setdefault(cell, {})[key] = (lat, lon)
+        self.positions[key] = (lat, lon, cell)
+        x, y = cell
+        if self.bounds is None:
+            self.bounds = [x, y, x, y]
+        else:
+            self.bounds = [min(self.bounds[0], x), min(self.bounds[1], y), max(self.bounds[2], x), max(self.bounds[3], y)]
+
+    def remove(self, key):
+        old = self.positions.pop(key, None)
+        if old is not None:
+            self._discard(key, old[2])
+
+    def _discard(self, key, cell):
+        bucket = self.cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self.cells[cell]
+
+    def sync(self, items):
+        # items: iterable (key, lat, lon); hanya titik yang bergerak yang diperbarui
+        for key, lat, lon in items:
+            old = self.positions.get(key)
+            if old is None or old[0] != lat or old[1] != lon:
+                self.update(key, lat, lon)
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            yield cx, cy
+            return
+        for x in range(cx - r, cx + r + 1):
+            yield x, cy - r
+            yield x, cy + r
+        for y in range(cy - r + 1, cy + r):
+            yield cx - r, y
+            yield cx + r, y
+
+    def iter_nearest(self, lat, lon, max_km=None):
+        # (key, jarak km) urut jarak terdekat, dibangkitkan sedikit demi sedikit: sel dibuka
+        # per cincin, titik hanya dikeluarkan jika tidak mungkin ada titik lebih dekat di
+        # cincin berikutnya. Faktor 0.99 menampung distorsi proyeksi
+        if self.bounds is None:
+            return
+        cx, cy = self._cell(lat, lon)
+        max_r = max(abs(cx - self.bounds[0]), abs(cx - self.bounds[2]), abs(cy - self.bounds[1]), abs(cy - self.bounds[3]))
+        if max_km is not None:
+            max_r = min(max_r, int(max_km / (self.cell_km * 0.99)) + 1)
+        heap = []
+        counter = itertools.count()
+        for r in range(max_r + 1):
+            for cell in self._ring(cx, cy, r):
+                bucket = self.cells.get(cell)
+                if not bucket:
+                    continue
+                keys = list(bucket)
+                coordinates = np.array(list(bucket.values()))
+                distance = haversine_km(lat, lon, coordinates[:, 0], coordinates[:, 1])
+                for key, d in zip(keys, distance.tolist()):
+                    heapq.heappush(heap, (d, next(counter), key))
+            reach = r * self.cell_km * 0.99
+            while heap and heap[0][0] <= reach:
+                d, _, key = heapq.heappop(heap)
+                if max_km is not None and d > max_km:
+                    return
+                yield key, d
+        while heap:
+            d, _, key = heapq.heappop(heap)
+            if max_km is not None and d > max_km:
+                return
+            yield key, d
+
+    def nearest(self, lat, lon, k=1, predicate=None):
+        # k titik terdekat [(key, jarak km)], predicate(key) untuk menyaring titik
+        matches = (item for item in self.iter_nearest(lat, lon) if predicate is None or predicate(item[0]))
+        return list(itertools.islice(matches, k))
+
+    def within(self, lat, lon, radius_km):
+        return list(self.iter_nearest(lat, lon, max_km=radius_km))
+
+
+def build_station_index(battery_swap_station, cell_km=2.0):
+    # Indeks stasiun dimiliki pemanggil (Simulation) dan dibangun ulang saat daftar stasiun berubah
+    index = GridIndex(cell_km)
+    for station_id, station in battery_swap_station.items():
+        index.update(station_id, station.lat, station.lon)
+    return index
+
+
+def nearest_station(lat, lon, station_index):
+    # (station_id, jarak km) stasiun terdekat dari satu titik, (None, inf) jika tidak ada stasiun
+    nearest = station_index.nearest(lat, lon) if station_index is not None else []
+    if not nearest:
+        return None, float('inf')
+    return nearest[0]
@@ -0,0 +1,45 @@
+import heapq
+import math
+import numpy as np
+
+
+def regret_insertion(solution, instance, to_remove, k=2):
+    # Sisipkan ulang EV satu per satu, EV dengan regret terbesar (selisih skor slot terbaik
+    # dengan k-1 alternatif berikutnya) lebih dulu. k=1 berarti greedy slot termurah.
+    # Biaya sisip tiap opsi diambil dari timeline slot (perubahan skor seluruh antrian).
+    if not len(to_remove):
+        return solution
+
+    for pos in to_remove:
+        solution.unassign(pos)
+
+    heap = []
+
+    def push(pos, options, scores, stamp):
+        top = np.argsort(-scores, kind='stable')[:k]
+        if len(top) < k:
+            regret = math.inf  # pilihan sedikit, sisipkan lebih dulu
+        else:
+            regret = float((scores[top[0]] - scores[top[1:]]).sum())
+        heapq.heappush(heap, (-regret, -float(scores[top[0]]), int(pos), top, options, scores, stamp))
+
+    for pos in to_remove:
+        options = instance.options(pos)
+        if len(options):
+            scores = np.array(solution.insertion_deltas(pos, options))
+            push(pos, options, scores, solution.slot_version[options])
+
+    while heap:
+        _, _, pos, top, options, scores, stamp = heapq.heappop(heap)
+        version = solution.slot_version[options]
+        changed = version != stamp
+        # Slot lain hanya bisa memburuk setelah disisipi, jadi cukup cek k slot teratas.
+        # Jika basi, hanya opsi yang slotnya berubah yang dihitung ulang
+        if changed[top].any():
+            scores = scores.copy()
+            scores[changed] = solution.insertion_deltas(pos, options[changed])
+            push(pos, options, scores, version)
+            continue
+        solution.move(pos, *instance.slot_key(options[top[0]]))
+
+    return solution
@@ -0,0 +1,334 @@
+import itertools
+import numpy as np
+from .budget import SearchBudget
+from .population import (
+    PopulationEvaluator, initial_population, make_rng, random_options,
+    row_to_solution, schedulable, waiting_times
+)
+from .solution import Instance
+
+# Engine berbasis populasi (GA, GWO, IGA, PREC) dari prototipe di algorithm_test.
+# Populasi berupa array (individu x EV) berisi slot global, fitness seluruh populasi
+# dinilai sekaligus lewat PopulationEvaluator (opsional paralel dengan max_workers).
+# max_iter dan stagnation_limit dihitung per generasi
+
+
+def _finish(instance, best_row):
+    # Skor akhir dihitung ulang oleh Solution supaya sama persis dengan engine lain
+    best = row_to_solution(instance, best_row)
+    return best, best.score
+
+
+def _weighted_pick(weights, rng):
+    # Satu kolom per baris dengan peluang sebanding weights
+    cumulative = weights.cumsum(axis=1)
+    target = rng.random(len(weights)) * cumulative[:, -1]
+    return (cumulative < target[:, None]).sum(axis=1)
+
+
+def genetic_algorithm(
+    battery_swap_station,
+    ev,
+    threshold,
+    charging_rate,
+    required_battery_threshold=80,
+    max_iter=1000,
+    population_size=50,
+    crossover_rate=0.8,
+    mutation_rate=0.2,
+    time_budget_ms=None,
+    stagnation_limit=None,
+    callback=None,
+    previous_schedule=None,
+    initialization='random',
+    objective=None,
+    max_workers=None
+):
+    # Seleksi turnamen 2 individu, uniform crossover per EV, mutasi memindahkan satu EV
+    # ke slot layak acak, individu terbaik selalu dibawa ke generasi berikutnya
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+    instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+    rng = make_rng()
+    positions = schedulable(instance)
+    population = initial_population(instance, population_size, rng, initialization, previous_schedule)
+    history = []
+
+    with PopulationEvaluator(instance, max_workers) as evaluate:
+        fitness = evaluate(population)
+        best_idx = int(np.argmax(fitness))
+        best_row, best_score = population[best_idx].copy(), fitness[best_idx]
+
+        for generation in itertools.count():
+            if budget.exhausted(generation):
+                break
+
+            pairs = rng.integers(0, population_size, (population_size, 2))
+            winners = np.where(fitness[pairs[:, 0]] >= fitness[pairs[:, 1]], pairs[:, 0], pairs[:, 1])
+            parents = population[winners]
+            mates = parents[rng.permutation(population_size)]
+            cross = (rng.random(population.shape) < 0.5) & (rng.random(population_size) < crossover_rate)[:, None]
+            children = np.where(cross, mates, parents)
+
+            mutants = np.flatnonzero(rng.random(population_size) < mutation_rate)
+            if len(mutants) and len(positions):
+                cols = positions[rng.integers(0, len(positions), len(mutants))]
+                children[mutants, cols] = random_options(instance, cols, rng)
+            children[0] = best_row
+
+            population = children
+            fitness = evaluate(population)
+            best_idx = int(np.argmax(fitness))
+            improved = fitness[best_idx] > best_score
+            if improved:
+                best_row, best_score = population[best_idx].copy(), fitness[best_idx]
+            budget.record(improved)
+
+            if callback:
+                callback(generation, best_score, fitness[best_idx])
+            history.append(float(best_score))
+
+    best, score = _finish(instance, best_row)
+    return best, score, history
+
+
+def grey_wolf_optimizer(
+    battery_swap_station,
+    ev,
+    threshold,
+    charging_rate,
+    required_battery_threshold=80,
+    max_iter=1000,
+    num_wolves=30,
+    initial_temp=10.0,
+    alpha=0.99,
+    a_decay=0.99,
+    time_budget_ms=None,
+    stagnation_limit=None,
+    callback=None,
+    previous_schedule=None,
+    initialization='random',
+    objective=None,
+    max_workers=None
+):
+    # GWO diskret: tiap EV pada serigala omega mengikuti suara alpha, beta, delta (mayoritas,
+    # atau salah satu acak jika ketiganya berbeda) dengan peluang 1 - a/2, a turun tiap
+    # iterasi. Posisi baru diterima dengan kriteria Metropolis per serigala
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+    instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+    rng = make_rng()
+    positions = schedulable(instance)
+    wolves = initial_population(instance, num_wolves, rng, initialization, previous_schedule)
+    history = []
+
+    with PopulationEvaluator(instance, max_workers) as evaluate:
+        fitness = evaluate(wolves)
+        best_idx = int(np.argmax(fitness))
+        best_row, best_score = wolves[best_idx].copy(), fitness[best_idx]
+
+        T, a = initial_temp, 2.0
+        for iteration in itertools.count():
+            if budget.exhausted(iteration):
+                break
+
+            leaders = np.argsort(fitness)[::-1][:3]
+            omegas = np.setdiff1d(np.arange(num_wolves), leaders)
+            if len(omegas) == 0:
+                break
+            alpha_row, beta_row, delta_row = (wolves[i][positions] for i in np.resize(leaders, 3))
+            shape = (len(omegas), len(positions))
+            random_leader = np.choose(rng.integers(0, 3, shape), [alpha_row, beta_row, delta_row])
+            vote = np.where(
+                (alpha_row == beta_row) | (alpha_row == delta_row), alpha_row,
+                np.where(beta_row == delta_row, beta_row, random_leader)
+            )
+            follow = rng.random(shape) >= a / 2
+            candidates = wolves[omegas]
+            candidates[:, positions] = np.where(follow, vote, candidates[:, positions])
+            if len(positions):
+                # Satu EV acak per serigala tetap dieksplorasi supaya kawanan tidak seragam
+                cols = positions[rng.integers(0, len(positions), len(omegas))]
+                candidates[np.arange(len(omegas)), cols] = random_options(instance, cols, rng)
+
+            candidate_fitness = evaluate(candidates)
+            delta = candidate_fitness - fitness[omegas]
+            accept = (delta > 0) | (rng.random(len(omegas)) < np.exp(np.minimum(delta, 0) / max(T, 1e-9)))
+            wolves[omegas[accept]] = candidates[accept]
+            fitness[omegas[accept]] = candidate_fitness[accept]
+
+            best_idx = int(np.argmax(fitness))
+            improved = fitness[best_idx] > best_score
+            if improved:
+                best_row, best_score = wolves[best_idx].copy(), fitness[best_idx]
+            budget.record(improved)
+            T *= alpha
+            a *= a_decay
+
+            if callback:
+                callback(iteration, best_score, fitness[best_idx])
+            history.append(float(best_score))
+
+    best, score = _finish(instance, best_row)
+    return best, score, history
+
+
+def iterated_greedy(
+    battery_swap_station,
+    ev,
+    threshold,
+    charging_rate,
+    required_battery_threshold=80,
+    max_iter=1000,
+    population_size=10,
+    n_samples=8,
+    initial_temp=100.0,
+    alpha=0.95,
+    T_min=0.001,
+    time_budget_ms=None,
+    stagnation_limit=None,
+    callback=None,
+    previous_schedule=None,
+    initialization='random',
+    objective=None,
+    max_workers=None
+):
+    # IGA: beberapa rantai berjalan serentak. Tiap iterasi satu EV per rantai dicabut (EV
+    # yang menunggu berbobot 6, lainnya 4) lalu disisipkan kembali ke slot terbaik dari
+    # n_samples slot layak acak; hasilnya diterima dengan kriteria Metropolis
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+    instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+    rng = make_rng()
+    positions = schedulable(instance)
+    population = initial_population(instance, population_size, rng, initialization, previous_schedule)
+    history = []
+
+    with PopulationEvaluator(instance, max_workers) as evaluate:
+        fitness = evaluate(population)
+        best_idx = int(np.argmax(fitness))
+        best_row, best_score = population[best_idx].copy(), fitness[best_idx]
+
+        T = initial_temp
+        for iteration in itertools.count():
+            if T < T_min or budget.exhausted(iteration) or len(positions) == 0:
+                break
+
+            weights = np.where(waiting_times(instance, population)[:, positions] > 0, 6.0, 4.0)
+            cols = positions[_weighted_pick(weights, rng)]
+            candidates = np.repeat(population, n_samples, axis=0)
+            sample_cols = np.repeat(cols, n_samples)
+            candidates[np.arange(len(candidates)), sample_cols] = random_options(instance, sample_cols, rng)
+
+            candidate_fitness = evaluate(candidates).reshape(population_size, n_samples)
+            pick = np.argmax(candidate_fitness, axis=1)
+            chosen = candidate_fitness[np.arange(population_size), pick]
+            delta = chosen - fitness
+            accept = (delta > 0) | (rng.random(population_size) < np.exp(np.minimum(delta, 0) / T))
+            accepted = np.flatnonzero(accept)
+            population[accepted] = candidates[accepted * n_samples + pick[accepted]]
+            fitness[accepted] = chosen[accepted]
+
+            best_idx = int(np.argmax(fitness))
+            improved = fitness[best_idx] > best_score
+            if improved:
+                best_row, best_score = population[best_idx].copy(), fitness[best_idx]
+            budget.record(improved)
+            T *= alpha
+
+            if callback:
+                callback(iteration, best_score, fitness[best_idx])
+            history.append(float(best_score))
+
+    best, score = _finish(instance, best_row)
+    return best, score, history
+
+
+def _ejection_chain(instance, row, positions, chain_length, rng):
+    # Slot chain_length EV acak digeser melingkar (EV ke-i mengambil slot EV ke-i+1),
+    # perpindahan ke stasiun yang tidak terjangkau dibatalkan
+    chain = rng.choice(positions, min(chain_length, len(positions)), replace=False)
+    shifted = np.roll(row[chain], -1)
+    feasible = instance.feasible[chain, instance.slot_station[shifted]]
+    row = row.copy()
+    row[chain[feasible]] = shifted[feasible]
+    return row
+
+
+def path_relinking(
+    battery_swap_station,
+    ev,
+    threshold,
+    charging_rate,
+    required_battery_threshold=80,
+    max_iter=1000,
+    population_size=20,
+    path_length=50,
+    top_k=10,
+    chain_length=10,
+    time_budget_ms=None,
+    stagnation_limit=None,
+    callback=None,
+    previous_schedule=None,
+    initialization='random',
+    objective=None,
+    max_workers=None
+):
+    # PREC: path relinking dari referensi pertama ke referensi kedua, seluruh titik di jalur
+    # dinilai sekaligus. Satu dari top_k titik terbaik diperbaiki dengan ejection chain, lalu
+    # menggantikan referensi pertama (jika lebih baik) atau kedua; jika tidak, referensi
+    # kedua diganti individu acak dari populasi awal
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+    instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+    rng = make_rng()
+    positions = schedulable(instance)
+    population = initial_population(instance, population_size, rng, initialization, previous_schedule)
+    history = []
+
+    with PopulationEvaluator(instance, max_workers) as evaluate:
+        fitness = evaluate(population)
+        order = np.argsort(fitness)[::-1]
+        ref1, score1 = population[order[0]].copy(), fitness[order[0]]
+        ref2, score2 = population[order[1 % population_size]].copy(), fitness[order[1 % population_size]]
+        best_row, best_score = ref1.copy(), score1
+
+        for iteration in itertools.count():
+            if budget.exhausted(iteration) or len(positions) == 0:
+                break
+
+            diff = rng.permutation(np.flatnonzero(ref1 != ref2))
+            if len(diff):
+                # Baris ke-j mengambil cuts[j] perbedaan pertama dari ref2
+                cuts = np.unique(np.linspace(1, len(diff), min(len(diff), path_length)).astype(np.int64))
+                rank = np.full(instance.n_ev, len(diff))
+                rank[diff] = np.arange(len(diff))
+                path = np.where(rank[None, :] < cuts[:, None], ref2, ref1)
+                path_fitness = evaluate(path)
+                top = np.argsort(path_fitness)[::-1][:top_k]
+                pick = int(rng.choice(top))
+                candidate, candidate_score = path[pick], path_fitness[pick]
+            else:
+                candidate, candidate_score = ref1, score1
+
+            ejected = _ejection_chain(instance, candidate, positions, chain_length, rng)
+            ejected_score = evaluate(ejected[None, :])[0]
+            if ejected_score > candidate_score:
+                candidate, candidate_score = ejected, ejected_score
+
+            if candidate_score > score1:
+                ref2, score2 = ref1, score1
+                ref1, score1 = candidate.copy(), candidate_score
+            elif candidate_score > score2 and not np.array_equal(candidate, ref1):
+                ref2, score2 = candidate.copy(), candidate_score
+            else:
+                other = int(rng.integers(0, population_size))
+                ref2, score2 = population[other].copy(), fitness[other]
+
+            improved = score1 > best_score
+            if improved:
+                best_row, best_score = ref1.copy(), score1
+            budget.record(improved)
+
+            if callback:
+                callback(iteration, best_score, candidate_score)
+            history.append(float(best_score))
+
+    best, score = _finish(instance, best_row)
+    return best, score, history
@@ -0,0 +1,96 @@
+import math
+import random
+
+# Reward per hasil langkah ALNS (Ropke & Pisinger): solusi terbaik baru atau ditolak
+REWARD_NEW_BEST = 33.0
+REWARD_REJECTED = 0.0
+
+
+def roulette_select(weights):
+    total = sum(weights)
+    r = random.uniform(0, total)
+    upto = 0
+    for i, w in enumerate(weights):
+        if upto + w >= r:
+            return i
+        upto += w
+    return len(weights) - 1
+
+
+def ucb1_select(rewards, counts, total_calls, c=2.0):
+    ucb_values = []
+    for i in range(len(rewards)):
+        if counts[i] == 0:
+            return i
+        avg_reward = rewards[i] / counts[i]
+        exploration_term = c * math.sqrt(math.log(total_calls) / counts[i])
+        ucb_values.append(avg_reward + exploration_term)
+    return ucb_values.index(max(ucb_values))
+
+
+class RouletteSelector:
+    # Bobot per operator, diperbarui tiap akhir segmen dari rata-rata reward segmen itu
+    def __init__(self, n_ops, reaction=0.2, min_weight=0.05):
+        self.reaction = reaction
+        self.min_weight = min_weight
+        self.weights = [1.0 for _ in range(n_ops)]
+        self.scores = [0.0 for _ in range(n_ops)]
+        self.counts = [0 for _ in range(n_ops)]
+        self.usage = [0 for _ in range(n_ops)]
+        self.successes = [0 for _ in range(n_ops)]
+
+    def select(self):
+        return roulette_select(self.weights)
+
+    def update(self, idx, reward):
+        self.scores[idx] += reward
+        self.counts[idx] += 1
+        self.usage[idx] += 1
+        if reward > REWARD_REJECTED:
+            self.successes[idx] += 1
+
+    def end_segment(self):
+        # Operator yang tidak dipakai di segmen ini mempertahankan bobotnya
+        for i in range(len(self.weights)):
+            if self.counts[i]:
+                self.weights[i] = max(
+                    self.min_weight,
+                    (1 - self.reaction) * self.weights[i] + self.reaction * self.scores[i] / self.counts[i],
+                )
+            self.scores[i] = 0.0
+            self.counts[i] = 0
+
+
+class UCB1Selector:
+    # Multi-armed bandit: rata-rata reward (dinormalisasi ke 0..1) + bonus eksplorasi
+    def __init__(self, n_ops, c=2.0):
+        self.c = c
+        self.rewards = [0.0 for _ in range(n_ops)]
+        self.usage = [0 for _ in range(n_ops)]
+        self.successes = [0 for _ in range(n_ops)]
+        self.total_calls = 0
+
+    @property
+    def weights(self):
+        return [r / n if n else 0.0 for r, n in zip(self.rewards, self.usage)]
+
+    def select(self):
+        return ucb1_select(self.rewards, self.usage, self.total_calls + 1, self.c)
+
+    def update(self, idx, reward):
+        self.rewards[idx] += reward / REWARD_NEW_BEST
+        self.usage[idx] += 1
+        self.total_calls += 1
+        if reward > REWARD_REJECTED:
+            self.successes[idx] += 1
+
+    def end_segment(self):
+        pass
+
+
+def make_selector(policy, n_ops):
+    if policy == 'roulette':
+        return RouletteSelector(n_ops)
+    if policy == 'ucb1':
+        return UCB1Selector(n_ops)
+    raise ValueError(f"Unknown operator selection policy: {policy}")
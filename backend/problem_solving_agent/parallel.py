@@ -0,0 +1,107 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .algorithm import alns_search
+from .budget import SearchBudget
+from .constructive import INITIALIZERS
+from .random_initialization import random_initialization
+from .solution import Instance, Solution
+from .warm_start import warm_start_initialization
+
+# Instance milik proses worker, dikirim sekali lewat initializer (bukan per task)
+_instance = None
+_initial_assignment = None
+
+
+def _init_worker(instance, initial_assignment=None):
+    global _instance, _initial_assignment
+    _instance = instance
+    _initial_assignment = initial_assignment
+
+
+def _run_chain(seed, max_iter, delta_evaluation, operator_selection, deadline, stagnation_limit):
+    random.seed(seed)
+    start = time.time()
+
+    # Deadline dihitung di proses utama supaya waktu antri di pool ikut terhitung
+    time_budget_ms = None if deadline is None else max(0.0, (deadline - start) * 1000)
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+
+    # Semua rantai mulai dari warm start yang sama, seed yang membedakan pencariannya. Tanpa
+    # warm start rantai mengacak sendiri di sini (urutan acak sama seperti di alns_search),
+    # supaya skor setelah inisialisasi tercatat sebelum pencarian dimulai
+    if _initial_assignment is not None:
+        initial_solution = Solution.from_assignment(_instance, *_initial_assignment)
+    else:
+        initial_solution = random_initialization(_instance)
+    initial_score = initial_solution.score
+
+    best, best_score, history = alns_search(
+        _instance, delta_evaluation=delta_evaluation,
+        operator_selection=operator_selection, budget=budget,
+        initial_solution=initial_solution
+    )
+
+    # Kirim balik hanya vektor assignment, bukan Solution beserta Instance-nya
+    return {
+        'seed': seed,
+        'station': best.station,
+        'slot': best.slot,
+        'score': best_score,
+        'initial_score': initial_score,
+        'iterations': len(history),
+        'stop_reason': budget.stop_reason,
+        'execution_time': time.time() - start,
+        'history': history,
+    }
+
+
+def parallel_alns(
+    battery_swap_station,
+    ev,
+    threshold,
+    charging_rate,
+    required_battery_threshold=80,
+    max_iter=1000,
+    n_chains=None,
+    max_workers=None,
+    seed=None,
+    delta_evaluation=True,
+    operator_selection='roulette',
+    time_budget_ms=None,
+    stagnation_limit=None,
+    previous_schedule=None,
+    initialization='random',
+    objective=None
+):
+    # Multi-start: N rantai ALNS independen dengan seed berbeda, ambil yang terbaik
+    deadline = None if time_budget_ms is None else time.time() + time_budget_ms / 1000
+    instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+    n_chains = n_chains or os.cpu_count() or 1
+    max_workers = min(max_workers or os.cpu_count() or 1, n_chains)
+
+    # Warm start / solusi konstruktif dibangun sekali di proses utama, worker hanya menerima
+    # vektor assignment-nya. Dengan initialization='random' tiap rantai mengacak sendiri
+    initial = None
+    if previous_schedule:
+        initial = warm_start_initialization(instance, previous_schedule)
+    elif initialization != 'random':
+        initial = INITIALIZERS[initialization](instance)
+    initial_assignment = None if initial is None else (initial.station, initial.slot)
+
+    rng = random.Random(seed)
+    seeds = [rng.randrange(2**32) for _ in range(n_chains)]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(instance, initial_assignment)) as executor:
+        futures = [executor.submit(_run_chain, s, max_iter, delta_evaluation, operator_selection, deadline, stagnation_limit) for s in seeds]
+        results = [future.result() for future in futures]
+
+    best_result = max(results, key=lambda r: r['score'])
+    best = Solution.from_assignment(instance, best_result['station'], best_result['slot'])
+
+    chain_stats = [
+        {key: value for key, value in result.items() if key not in ('station', 'slot')}
+        for result in results
+    ]
+    return best, best.score, chain_stats
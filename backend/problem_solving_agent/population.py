@@ -0,0 +1,180 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .constructive import INITIALIZERS, slot_tails
+from .evaluation import evaluate_solution, swap_score
+from .solution import Solution
+from .timeline import handover_arrays
+from .warm_start import warm_start_initialization
+
+# Populasi disimpan sebagai array int (individu x EV) berisi slot global yang dipilih,
+# -1 untuk EV yang tidak dijadwalkan (bukan kandidat, jadwal tetap, atau tanpa opsi)
+
+
+def make_rng():
+    # Generator numpy yang diturunkan dari modul random, supaya random.seed tetap menentukan hasil
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def solution_to_row(solution):
+    inst = solution.instance
+    row = np.full(inst.n_ev, -1, dtype=np.int32)
+    movable = solution.movable()
+    row[movable] = inst.slot_offset[solution.station[movable]] + solution.slot[movable]
+    return row
+
+
+def row_to_solution(instance, row):
+    assigned = row >= 0
+    station = np.where(assigned, instance.slot_station[np.maximum(row, 0)], -1)
+    slot = np.where(assigned, instance.slot_local[np.maximum(row, 0)], -1)
+    return Solution.from_assignment(instance, station, slot)
+
+
+def schedulable(instance):
+    # Posisi EV kandidat yang punya minimal satu slot layak
+    counts = np.diff(instance.option_ptr)
+    return np.flatnonzero(instance.candidate & (counts > 0))
+
+
+def random_options(instance, positions, rng):
+    # Satu slot layak acak untuk tiap posisi (boleh berulang), langsung dari indeks CSR
+    start = instance.option_ptr[positions]
+    counts = instance.option_ptr[positions + 1] - start
+    return instance.option_slot[start + (rng.random(np.shape(positions)) * counts).astype(np.int64)]
+
+
+def initial_population(instance, size, rng, initialization='random', previous_schedule=None):
+    # Individu pertama dari warm start / solusi konstruktif, sisanya acak supaya populasi beragam
+    positions = schedulable(instance)
+    population = np.full((size, instance.n_ev), -1, dtype=np.int32)
+    population[:, positions] = random_options(instance, np.broadcast_to(positions, (size, len(positions))), rng)
+    if previous_schedule:
+        population[0] = solution_to_row(warm_start_initialization(instance, previous_schedule))
+    elif initialization != 'random':
+        population[0] = solution_to_row(INITIALIZERS[initialization](instance))
+    return population
+
+
+def simulate_population(instance, population):
+    # Simulasi antrian semua individu sekaligus. Tiap (individu, slot) adalah satu antrian,
+    # urut travel_time lalu ev_id; antrian diproses per urutan ke-k secara serentak, sehingga
+    # jumlah langkah Python sama dengan panjang antrian terpanjang, bukan jumlah EV
+    rows, cols = np.nonzero(population >= 0)
+    slots = population[rows, cols].astype(np.int64)
+    stations = instance.slot_station[slots]
+    arrival_time = instance.travel_time[cols, stations]
+    queue = rows.astype(np.int64) * instance.n_slot + slots
+
+    order = np.lexsort((np.asarray(instance.id_rank)[cols], arrival_time, queue))
+    rows, cols, slots, stations, arrival_time, queue = (
+        a[order] for a in (rows, cols, slots, stations, arrival_time, queue)
+    )
+    exchanged_battery = instance.exchanged_battery[cols, stations]
+    exchanged_battery_cycle = instance.battery_cycle[cols]
+
+    first = np.ones(len(queue), dtype=bool)
+    first[1:] = queue[1:] != queue[:-1]
+    queue_id = np.cumsum(first) - 1
+    starts = np.flatnonzero(first)
+    rank = np.arange(len(queue)) - starts[queue_id]
+
+    # Kondisi ujung tiap antrian, mulai dari kondisi awal slot (termasuk jadwal tetap)
+    ready_time, battery, cycle = (column[slots[starts]].copy() for column in slot_tails(instance))
+    waiting_time = np.empty(len(queue))
+    received_battery = np.empty(len(queue))
+    received_battery_cycle = np.empty(len(queue))
+
+    by_rank = np.argsort(rank, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(rank))]) if len(rank) else [0]
+    for k in range(len(bounds) - 1):
+        idx = by_rank[bounds[k]:bounds[k + 1]]
+        q = queue_id[idx]
+        waiting_time[idx], received_battery[idx], received_battery_cycle[idx] = handover_arrays(
+            ready_time[q], battery[q], cycle[q], arrival_time[idx],
+            instance.charging_rate, instance.required_battery_threshold
+        )
+        ready_time[q] = arrival_time[idx] + waiting_time[idx]
+        battery[q] = exchanged_battery[idx]
+        cycle[q] = exchanged_battery_cycle[idx]
+
+    return {
+        'rows': rows,
+        'cols': cols,
+        'waiting_time': np.round(waiting_time, 2),
+        'received_battery': np.round(received_battery, 2),
+        'received_battery_cycle': np.round(received_battery_cycle, 2),
+        'exchanged_battery': exchanged_battery,
+        'exchanged_battery_cycle': exchanged_battery_cycle,
+    }
+
+
+def fixed_score(instance):
+    # Kontribusi jadwal tetap, sama untuk semua individu
+    return evaluate_solution(Solution(instance))
+
+
+def evaluate_population(instance, population, base_score=None):
+    # Fitness tiap individu, sama dengan skor Solution untuk assignment yang sama
+    if base_score is None:
+        base_score = fixed_score(instance)
+    result = simulate_population(instance, population)
+    scores = swap_score(
+        result['received_battery'], result['received_battery_cycle'],
+        result['exchanged_battery'], result['exchanged_battery_cycle'],
+        result['waiting_time'], instance.objective,
+    )
+    return base_score + np.bincount(result['rows'], weights=scores, minlength=len(population))
+
+
+def waiting_times(instance, population):
+    # Waiting time per (individu, EV), 0 untuk EV yang tidak dijadwalkan
+    result = simulate_population(instance, population)
+    waiting = np.zeros(population.shape)
+    waiting[result['rows'], result['cols']] = result['waiting_time']
+    return waiting
+
+
+# Instance milik proses worker evaluasi, dikirim sekali lewat initializer
+_instance = None
+_base_score = None
+
+
+def _init_worker(instance, base_score):
+    global _instance, _base_score
+    _instance = instance
+    _base_score = base_score
+
+
+def _evaluate_chunk(population):
+    return evaluate_population(_instance, population, _base_score)
+
+
+class PopulationEvaluator:
+    # Evaluasi fitness populasi, dibagi ke beberapa proses jika max_workers > 1
+    def __init__(self, instance, max_workers=None):
+        self.instance = instance
+        self.base_score = fixed_score(instance)
+        self.max_workers = max_workers or 1
+        self.executor = None
+        if self.max_workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker, initargs=(instance, self.base_score)
+            )
+
+    def __call__(self, population):
+        if self.executor is None or len(population) < 2 * self.max_workers:
+            return evaluate_population(self.instance, population, self.base_score)
+        chunks = np.array_split(population, self.max_workers)
+        return np.concatenate(list(self.executor.map(_evaluate_chunk, chunks)))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,91 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+# Fase yang selalu muncul di laporan, meskipun solver tertentu tidak memakainya
+PHASES = ('initialization', 'destroy', 'repair', 'queue_update', 'evaluate', 'copy', 'rollback')
+
+
+class SolverProfiler:
+    # Waktu per fase, statistik iterasi/operator, dan kurva skor terbaik terhadap waktu
+    def __init__(self, solver=None):
+        self.solver = solver
+        self.start = time.perf_counter()
+        self.phases = {name: 0.0 for name in PHASES}
+        self.iterations = 0
+        self.accepted = 0
+        self.best_curve = []
+        self.operators = {}
+        self.cache = None
+        self.stop_reason = None
+        self.end = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def iteration(self, accepted):
+        self.iterations += 1
+        if accepted:
+            self.accepted += 1
+
+    def best(self, score):
+        self.best_curve.append((time.perf_counter() - self.start, float(score)))
+
+    def record_operators(self, kind, operators, selector):
+        self.operators[kind] = [
+            {'name': op.__name__, 'usage': usage, 'successes': successes, 'weight': float(weight)}
+            for op, usage, successes, weight in zip(operators, selector.usage, selector.successes, selector.weights)
+        ]
+
+    def record_cache(self, stats):
+        self.cache = stats
+
+    def finish(self, stop_reason=None):
+        self.stop_reason = stop_reason
+        self.end = time.perf_counter()
+
+    def report(self):
+        total_time = (self.end or time.perf_counter()) - self.start
+        return {
+            'solver': self.solver,
+            'total_time': total_time,
+            'iterations': self.iterations,
+            'iterations_per_second': self.iterations / total_time if total_time > 0 else 0.0,
+            'acceptance_rate': self.accepted / self.iterations if self.iterations else 0.0,
+            'stop_reason': self.stop_reason,
+            'phases': dict(self.phases),
+            'operators': self.operators,
+            'score_cache': self.cache,
+            'best_score_curve': self.best_curve,
+        }
+
+    def write_jsonl(self, path, **extra):
+        # Satu baris JSON per solve, ditambahkan ke akhir file
+        with open(path, 'a') as f:
+            f.write(json.dumps(dict(self.report(), **extra)) + '\n')
+
+
+class NullProfiler:
+    # Dipakai jika profiling tidak diminta, semua pencatatan diabaikan
+    def phase(self, name):
+        return nullcontext()
+
+    def iteration(self, accepted):
+        pass
+
+    def best(self, score):
+        pass
+
+    def record_operators(self, kind, operators, selector):
+        pass
+
+    def record_cache(self, stats):
+        pass
+
+    def finish(self, stop_reason=None):
+        pass
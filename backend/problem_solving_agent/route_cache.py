@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# Pita jam (WIB) dengan kecepatan lalu lintas yang mirip: rute pada pita berbeda disimpan terpisah
+SPEED_BANDS = [
+    (0, 6, 'night'),
+    (6, 10, 'morning_peak'),
+    (10, 16, 'day'),
+    (16, 20, 'evening_peak'),
+    (20, 24, 'night'),
+]
+
+
+def speed_band(hour=None):
+    if hour is None:
+        hour = datetime.now(ZoneInfo('Asia/Jakarta')).hour
+    for start, end, band in SPEED_BANDS:
+        if start <= hour % 24 < end:
+            return band
+
+
+class RouteCache:
+    # Cache rute dua tingkat: LRU di memori lalu SQLite di disk (path=None = memori saja).
+    # Key berupa koordinat asal/tujuan yang dibulatkan ke grid (derajat) dan pita jam,
+    # nilai (distance_km, duration_min). Entri lebih tua dari ttl detik dianggap tidak ada.
+    def __init__(self, path=None, grid=0.0005, ttl=7 * 24 * 3600, maxsize=100000, max_disk_entries=1000000):
+        self.path = path
+        self.grid = grid
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_disk_entries = max_disk_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS routes ('
+                'key TEXT PRIMARY KEY, distance_km REAL, duration_min REAL, stored_at REAL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS routes_stored_at ON routes (stored_at)')
+            self._db.commit()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, origin_lat, origin_lon, destination_lat, destination_lon, hour=None):
+        cells = ':'.join(str(round(c / self.grid)) for c in (origin_lat, origin_lon, destination_lat, destination_lon))
+        return f"{cells}:{speed_band(hour)}"
+
+    def get(self, origin_lat, origin_lon, destination_lat, destination_lon, hour=None):
+        if None in (origin_lat, origin_lon, destination_lat, destination_lon):
+            return None
+        key = self.key(origin_lat, origin_lon, destination_lat, destination_lon, hour)
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[2] <= self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1]
+
+            row = None
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT distance_km, duration_min, stored_at FROM routes WHERE key = ? AND stored_at >= ?',
+                    (key, now - self.ttl)
+                ).fetchone()
+            if row is None:
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._remember(key, row)
+            self.disk_hits += 1
+            return row[0], row[1]
+
+    def put(self, origin_lat, origin_lon, destination_lat, destination_lon, value, hour=None):
+        self.put_many([((origin_lat, origin_lon, destination_lat, destination_lon), value)], hour)
+
+    def put_many(self, items, hour=None):
+        # items: [((origin_lat, origin_lon, destination_lat, destination_lon), (distance_km, duration_min))],
+        # disimpan ke disk dalam satu transaksi
+        now = time.time()
+        rows = [
+            (self.key(*coords, hour), value[0], value[1], now)
+            for coords, value in items
+            if None not in coords
+        ]
+        with self._lock:
+            for key, distance_km, duration_min, stored_at in rows:
+                self._remember(key, (distance_km, duration_min, stored_at))
+            if self._db is not None and rows:
+                self._db.executemany('INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?)', rows)
+                self._db.commit()
+                self._writes += len(rows)
+                if self._writes >= 1000:
+                    self._prune(now)
+
+    def _remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _prune(self, now):
+        # Dijalankan tiap 1000 penulisan: buang entri kedaluwarsa, lalu entri tertua
+        # jika melebihi max_disk_entries
+        self._writes = 0
+        self._db.execute('DELETE FROM routes WHERE stored_at < ?', (now - self.ttl,))
+        excess = self._db.execute('SELECT COUNT(*) FROM routes').fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                'DELETE FROM routes WHERE key IN (SELECT key FROM routes ORDER BY stored_at LIMIT ?)', (excess,)
+            )
+        self._db.commit()
+
+    def disk_size(self):
+        if self._db is None:
+            return 0
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM routes').fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'size': len(self.entries),
+            'maxsize': self.maxsize,
+            'disk_size': self.disk_size(),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,147 @@
+import math
+import os
+import threading
+import numpy as np
+from .route_cache import RouteCache
+from .routing_client import RoutingClient
+
+# Alamat OSRM bisa diganti lewat environment, misal server routing lokal untuk pengujian
+OSRM_URL = os.getenv("OSRM_URL", "http://host.docker.internal:5000")
+
+# Batas koordinat per request /table (default --max-table-size osrm-routed adalah 100)
+OSRM_MAX_TABLE_SIZE = int(os.getenv("OSRM_MAX_TABLE_SIZE", "100"))
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def routing_client():
+    # Klien OSRM bersama, dibuat saat pertama dipakai. OSRM_CONCURRENCY = jumlah request yang
+    # boleh berjalan bersamaan
+    with _shared_lock:
+        if 'client' not in _shared:
+            _shared['client'] = RoutingClient(
+                OSRM_URL,
+                max_concurrency=int(os.getenv("OSRM_CONCURRENCY", "8")),
+                timeout=float(os.getenv("OSRM_TIMEOUT", "10")),
+            )
+        return _shared['client']
+
+
+def route_cache():
+    # Cache rute bersama antar ronde penjadwalan, dibuat saat pertama dipakai. Hanya disimpan ke
+    # SQLite jika ROUTE_CACHE_PATH diisi, selain itu hanya di memori
+    with _shared_lock:
+        if 'cache' not in _shared:
+            _shared['cache'] = RouteCache(
+                path=os.getenv("ROUTE_CACHE_PATH") or None,
+                grid=float(os.getenv("ROUTE_CACHE_GRID", "0.0005")),
+                ttl=float(os.getenv("ROUTE_CACHE_TTL", str(7 * 24 * 3600))),
+                maxsize=int(os.getenv("ROUTE_CACHE_SIZE", "100000")),
+            )
+        return _shared['cache']
+
+
+def haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon):
+    """Haversine distance calculation"""
+    R = 6371
+    lat1_rad, lon1_rad = math.radians(origin_lat), math.radians(origin_lon)
+    lat2_rad, lon2_rad = math.radians(destination_lat), math.radians(destination_lon)
+
+    dlat, dlon = lat2_rad - lat1_rad, lon2_rad - lon1_rad
+    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+
+    distance_km = max(R * c, 0.000001)
+    duration_min = max((distance_km / 25) * 60, 0.000001)  # 25 km/h average for Jakarta
+
+    return distance_km, duration_min
+
+
+def nearest_k(values, k):
+    # Indeks k kolom dengan nilai terkecil per baris (argpartition, tanpa sort penuh), urut
+    # indeks kolom. Nilai sama di batas dipilih dari kolom terkecil, sama dengan sort stabil
+    values = np.atleast_2d(values)
+    k = min(k, values.shape[1])
+    if k == 0:
+        return np.zeros((len(values), 0), dtype=np.int64)
+    candidates = np.argpartition(values, k - 1, axis=1)[:, :k]
+    kth = np.take_along_axis(values, candidates, axis=1).max(axis=1, keepdims=True)
+    chosen = values < kth
+    ties = values == kth
+    chosen |= ties & (np.cumsum(ties, axis=1) <= k - chosen.sum(axis=1, keepdims=True))
+    return np.nonzero(chosen)[1].reshape(len(values), k)
+
+
+def osrm_leg(distance_m, duration_s):
+    # Konversi hasil OSRM ke (km, menit)
+    distance_km = max(distance_m / 1000, 0.000001)
+    duration_min = max(round(duration_s / (60 * 2), 2), 0.000001)
+    return distance_km, duration_min
+
+
+class RouteMatrix:
+    # Kumpulan leg (origin, destination) satu ronde penjadwalan. Leg yang sama hanya disimpan
+    # sekali, leg yang ada di cache langsung terisi, sisanya diselesaikan dengan sesedikit
+    # mungkin request many-to-many /table yang dikirim bersamaan. Koordinat berupa tuple (lat, lon)
+    def __init__(self, client=None, max_table_size=None, cache=None):
+        self.client = client or routing_client()
+        self.max_table_size = max_table_size or OSRM_MAX_TABLE_SIZE
+        self.cache = cache if cache is not None else route_cache()
+        self.legs = {}
+        self.n_requests = 0
+        self.n_fallback = 0
+
+    def add(self, origin, destination):
+        key = (tuple(origin), tuple(destination))
+        if key not in self.legs:
+            self.legs[key] = self.cache.get(*origin, *destination)
+        return key
+
+    def get(self, origin, destination):
+        return self.legs[(tuple(origin), tuple(destination))]
+
+    def _blocks(self, pending):
+        # Origin dikelompokkan bersama tujuan masing-masing; satu blok = sources x destinations
+        # dengan total koordinat <= max_table_size
+        by_origin = {}
+        for origin, destination in pending:
+            by_origin.setdefault(origin, []).append(destination)
+
+        sources, destinations = [], {}
+        for origin, targets in by_origin.items():
+            for start in range(0, len(targets), self.max_table_size - 1):
+                chunk = targets[start:start + self.max_table_size - 1]
+                new = [d for d in chunk if d not in destinations]
+                if sources and len(sources) + 1 + len(destinations) + len(new) > self.max_table_size:
+                    yield sources, list(destinations)
+                    sources, destinations = [], {}
+                    new = chunk
+                sources.append(origin)
+                destinations.update(dict.fromkeys(new))
+        if sources:
+            yield sources, list(destinations)
+
+    def resolve(self):
+        # Isi semua leg yang belum punya hasil; blok yang gagal atau leg tanpa rute
+        # memakai estimasi haversine
+        pending = [key for key, value in self.legs.items() if value is None]
+        blocks = list(self._blocks(pending))
+        self.n_requests += len(blocks)
+        resolved = []
+        for (sources, destinations), table in zip(blocks, self.client.tables(blocks)):
+            distances, durations = table or (None, None)
+            for i, origin in enumerate(sources):
+                for j, destination in enumerate(destinations):
+                    key = (origin, destination)
+                    if key not in self.legs or self.legs[key] is not None:
+                        continue
+                    if distances is None or distances[i][j] is None or durations[i][j] is None:
+                        self.n_fallback += 1
+                        self.legs[key] = haversine_distance(*origin, *destination)
+                    else:
+                        self.legs[key] = osrm_leg(distances[i][j], durations[i][j])
+                        resolved.append(((*origin, *destination), self.legs[key]))
+        # Hanya hasil OSRM yang disimpan, estimasi haversine dicoba lagi di ronde berikutnya
+        self.cache.put_many(resolved)
+        return self
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import httpx
+
+
+class RoutingClient:
+    # Klien OSRM async (httpx) dengan koneksi keep-alive dan jumlah request bersamaan dibatasi
+    # max_concurrency. Event loop berjalan di thread sendiri, jadi method batch (resolve, tables,
+    # snap) bisa dipanggil dari kode sinkron maupun dari dalam endpoint async, dan pool koneksi
+    # tetap terpakai antar ronde penjadwalan. Request yang gagal menghasilkan None
+    def __init__(self, osrm_url, max_concurrency=8, timeout=10):
+        self.osrm_url = osrm_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.n_requests = 0
+        self.n_errors = 0
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='routing-client', daemon=True).start()
+                self._client, self._semaphore = asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+                self._loop = loop
+        return self._loop
+
+    async def _open(self):
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        return httpx.AsyncClient(timeout=self.timeout, limits=limits), asyncio.Semaphore(self.max_concurrency)
+
+    def _run(self, coroutines):
+        # Jalankan semua coroutine bersamaan di loop klien, hasil urut sesuai input. Error satu
+        # item (misal respons tidak lengkap) hanya membuat item itu None, bukan seluruh batch
+        coroutines = list(coroutines)
+        if not coroutines:
+            return []
+
+        async def gather():
+            return await asyncio.gather(*coroutines, return_exceptions=True)
+
+        results = asyncio.run_coroutine_threadsafe(gather(), self._start()).result()
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                self.n_errors += 1
+                results[i] = None
+        return results
+
+    async def _get_json(self, url):
+        async with self._semaphore:
+            self.n_requests += 1
+            try:
+                response = await self._client.get(url)
+                data = response.json()
+            except Exception:
+                data = None
+        if data is None or data.get('code') != 'Ok':
+            self.n_errors += 1
+            return None
+        return data
+
+    async def _route(self, origin, destination):
+        (origin_lat, origin_lon), (destination_lat, destination_lon) = origin, destination
+        data = await self._get_json(
+            f"{self.osrm_url}/route/v1/driving/{origin_lon},{origin_lat};{destination_lon},{destination_lat}?overview=false"
+        )
+        if data is None or not data.get('routes'):
+            return None
+        route = data['routes'][0]
+        return route['distance'], route['duration']
+
+    async def _table(self, sources, destinations):
+        coordinates = ';'.join(f"{lon},{lat}" for lat, lon in list(sources) + list(destinations))
+        data = await self._get_json(
+            f"{self.osrm_url}/table/v1/driving/{coordinates}"
+            f"?sources={';'.join(str(i) for i in range(len(sources)))}"
+            f"&destinations={';'.join(str(len(sources) + j) for j in range(len(destinations)))}"
+            f"&annotations=distance,duration"
+        )
+        if data is None:
+            return None
+        return data['distances'], data['durations']
+
+    async def _nearest(self, point):
+        lat, lon = point
+        data = await self._get_json(f"{self.osrm_url}/nearest/v1/driving/{lon},{lat}")
+        if data is None or not data.get('waypoints'):
+            return None
+        snapped = data['waypoints'][0]['location']
+        return snapped[1], snapped[0]
+
+    def resolve(self, pairs):
+        # pairs: [((lat, lon), (lat, lon))] -> [(distance_m, duration_s) atau None], satu /route per pasangan
+        return self._run(self._route(origin, destination) for origin, destination in pairs)
+
+    def tables(self, blocks):
+        # blocks: [(sources, destinations)] -> [(distances, durations) atau None], satu /table per blok
+        return self._run(self._table(sources, destinations) for sources, destinations in blocks)
+
+    def snap(self, points):
+        # points: [(lat, lon)] -> [(lat, lon) di jalan terdekat atau None]
+        return self._run(self._nearest(point) for point in points)
+
+    def close(self):
+        with self._lock:
+            if self._loop is not None:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = self._client = self._semaphore = None
@@ -0,0 +1,404 @@
+import copy
+import numpy as np
+from .evaluation import DEFAULT_OBJECTIVE, swap_score, evaluate_solution
+from .timeline import SlotTimeline
+
+MASK_64 = (1 << 64) - 1
+
+# Array per EV yang ikut disalin / dipulihkan
+FIELDS = (
+    'assigned', 'station', 'slot', 'energy_distance', 'travel_time', 'waiting_time',
+    'exchanged_battery', 'received_battery', 'exchanged_battery_cycle', 'received_battery_cycle',
+)
+
+class Instance:
+    # Data masalah yang hanya dibaca selama solve, diindeks berdasarkan posisi EV
+    def __init__(self, battery_swap_station, ev, charging_rate, required_battery_threshold=80, objective=None):
+        self.battery_swap_station = battery_swap_station
+        self.ev = ev
+        self.charging_rate = charging_rate
+        self.required_battery_threshold = required_battery_threshold
+        self.objective = objective or DEFAULT_OBJECTIVE
+
+        self.ev_ids = list(ev.keys())
+        self.n_ev = len(self.ev_ids)
+        # Peringkat ev_id, pemecah seri antrian saat travel_time sama
+        self.id_rank = [0] * self.n_ev
+        for rank, pos in enumerate(sorted(range(self.n_ev), key=self.ev_ids.__getitem__)):
+            self.id_rank[pos] = rank
+        self.n_station = len(battery_swap_station)
+
+        self.battery_now = np.array([ev[i]['battery_now'] for i in self.ev_ids], dtype=np.float64)
+        self.battery_cycle = np.array([ev[i]['battery_cycle'] for i in self.ev_ids], dtype=np.float64)
+        self.fixed = np.array([bool(ev[i]['swap_schedule']) for i in self.ev_ids], dtype=bool)
+        self.candidate = ~self.fixed & (self.battery_now <= self.objective.swap_threshold)
+
+        # EV yang tidak dijadwalkan tidak punya energy_distance / travel_time
+        self.energy_distance = np.full((self.n_ev, self.n_station), 99999.0)
+        self.travel_time = np.full((self.n_ev, self.n_station), 99999.0)
+        for pos, i in enumerate(self.ev_ids):
+            if ev[i]['energy_distance']:
+                self.energy_distance[pos] = ev[i]['energy_distance']
+                self.travel_time[pos] = ev[i]['travel_time']
+
+        # Baterai tersisa setelah perjalanan dengan memperhitungkan degradasi
+        battery_now = self.battery_now[:, None]
+        battery_cycle = self.battery_cycle[:, None]
+        self.feasible = (battery_now * (100 - battery_cycle * 0.025) / 100) - self.energy_distance >= 0
+        actual_percentage = 1 - (0.00025 * battery_cycle)
+        degradation_factor = 1 / actual_percentage
+        self.exchanged_battery = battery_now - self.energy_distance * degradation_factor
+
+        # Slot diratakan menjadi satu indeks global: slot_offset[station] + slot
+        self.slot_count = np.array([len(slots) for slots in battery_swap_station], dtype=np.int32)
+        self.slot_offset = np.zeros(self.n_station, dtype=np.int32)
+        if self.n_station:
+            self.slot_offset[1:] = np.cumsum(self.slot_count)[:-1]
+        self.n_slot = int(self.slot_count.sum())
+        self.slot_station = np.repeat(np.arange(self.n_station, dtype=np.int32), self.slot_count)
+        self.slot_local = np.arange(self.n_slot, dtype=np.int32) - np.repeat(self.slot_offset, self.slot_count)
+
+        # Indeks kandidat per EV (format CSR): slot global yang layak untuk EV pos ada di
+        # option_slot[option_ptr[pos]:option_ptr[pos + 1]], urut stasiun lalu slot
+        rows, stations = np.nonzero(self.feasible)
+        counts = self.slot_count[stations]
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        self.option_slot = (
+            np.repeat(self.slot_offset[stations], counts) + np.arange(int(counts.sum())) - first
+        ).astype(np.int32)
+        self.option_ptr = np.zeros(self.n_ev + 1, dtype=np.int32)
+        self.option_ptr[1:] = np.cumsum(np.bincount(rows, weights=counts, minlength=self.n_ev))
+
+        # Kondisi awal tiap slot: (last_ready_time, last_insert, last_insert_cycle)
+        self.slot_base = [
+            (0, slot[0], slot[1])
+            for slots in battery_swap_station
+            for slot in slots
+        ]
+
+        # Jadwal tetap mengisi ujung antrian slot lebih dulu
+        base_ready = {}
+        for pos, i in enumerate(self.ev_ids):
+            sched = ev[i]['swap_schedule']
+            if not (sched and sched.get('assigned')):
+                continue
+            station_idx, slot_idx = sched['battery_station'], sched['slot']
+            if not self.valid_slot(station_idx, slot_idx):
+                continue
+            g = self.slot_index(station_idx, slot_idx)
+            ready_time = sched['travel_time'] + sched['waiting_time']
+            if g not in base_ready or ready_time >= base_ready[g]:
+                base_ready[g] = ready_time
+                self.slot_base[g] = (ready_time, sched['exchanged_battery'], sched['battery_cycle'])
+
+    def valid_slot(self, station_idx, slot_idx):
+        if station_idx is None or slot_idx is None:
+            return False
+        return 0 <= station_idx < self.n_station and 0 <= slot_idx < self.slot_count[station_idx]
+
+    def slot_index(self, station_idx, slot_idx):
+        return int(self.slot_offset[station_idx]) + int(slot_idx)
+
+    def options(self, pos):
+        # Slot global yang layak untuk EV pada posisi pos
+        return self.option_slot[self.option_ptr[pos]:self.option_ptr[pos + 1]]
+
+    def slot_key(self, g):
+        return int(self.slot_station[g]), int(self.slot_local[g])
+
+    def zobrist(self, pos, g):
+        # Kunci 64-bit pseudo-acak untuk pasangan (EV, slot global), splitmix64 tanpa tabel
+        x = ((int(pos) * (self.n_slot + 1) + int(g) + 1) * 0x9E3779B97F4A7C15) & MASK_64
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK_64
+        return x ^ (x >> 31)
+
+
+class Solution:
+    # Struct-of-arrays, satu elemen per posisi EV di instance.ev_ids
+    def __init__(self, instance):
+        n = instance.n_ev
+        self.instance = instance
+        self.assigned = np.zeros(n, dtype=bool)
+        self.station = np.full(n, -1, dtype=np.int32)
+        self.slot = np.full(n, -1, dtype=np.int32)
+        self.energy_distance = np.zeros(n)
+        self.travel_time = np.zeros(n)
+        self.waiting_time = np.zeros(n)
+        self.exchanged_battery = np.zeros(n)
+        self.received_battery = np.zeros(n)
+        self.exchanged_battery_cycle = np.zeros(n)
+        self.received_battery_cycle = np.zeros(n)
+
+        # Timeline antrian per slot global (hanya EV tanpa jadwal tetap)
+        self.timelines = {}
+        self.score = 0.0
+        self._dirty = set()
+        # XOR kunci Zobrist semua (EV, slot) yang assigned, diperbarui tiap move/unassign
+        self.fingerprint = 0
+        # Naik setiap kali antrian slot berubah, dipakai untuk mendeteksi biaya sisip yang basi
+        self.slot_version = np.zeros(instance.n_slot, dtype=np.int64)
+
+        # Undo log selama satu langkah operator, None jika tidak sedang dicatat
+        self._undo = None
+
+        # Jadwal tetap ikut dinilai tetapi tidak pernah dipindah
+        for pos in np.flatnonzero(instance.fixed):
+            sched = instance.ev[instance.ev_ids[pos]]['swap_schedule']
+            if not sched.get('assigned'):
+                continue
+            self.assigned[pos] = True
+            if instance.valid_slot(sched['battery_station'], sched['slot']):
+                self.station[pos] = sched['battery_station']
+                self.slot[pos] = sched['slot']
+            self.energy_distance[pos] = sched.get('energy_distance') or 0
+            self.travel_time[pos] = sched.get('travel_time') or 0
+            self.waiting_time[pos] = sched.get('waiting_time') or 0
+            self.exchanged_battery[pos] = sched.get('exchanged_battery') or 0
+            self.received_battery[pos] = sched.get('received_battery') or 0
+            self.exchanged_battery_cycle[pos] = sched.get('exchanged_battery_cycle') or 0
+            self.received_battery_cycle[pos] = sched.get('received_battery_cycle') or 0
+
+    @classmethod
+    def from_assignment(cls, instance, station, slot):
+        # Bangun ulang solusi dari vektor (station, slot) per EV, -1 berarti tidak assigned
+        solution = cls(instance)
+        for pos in np.flatnonzero(~instance.fixed & (np.asarray(station) >= 0)):
+            solution.move(pos, int(station[pos]), int(slot[pos]))
+        solution.refresh()
+        return solution
+
+    def copy(self):
+        other = copy.copy(self)
+        for name in FIELDS:
+            setattr(other, name, getattr(self, name).copy())
+        other.timelines = {g: timeline.copy() for g, timeline in self.timelines.items()}
+        other.slot_version = self.slot_version.copy()
+        other._dirty = set(self._dirty)
+        other._undo = None
+        return other
+
+    def begin(self):
+        # Mulai mencatat perubahan supaya langkah yang ditolak bisa dibatalkan
+        self._undo = {'score': self.score, 'fingerprint': self.fingerprint, 'ev': {}, 'slot': {}}
+
+    def commit(self):
+        self._undo = None
+
+    def rollback(self):
+        # Pulihkan hanya EV dan timeline slot yang berubah sejak begin()
+        undo = self._undo
+        for g, timeline in undo['slot'].items():
+            if timeline is None:
+                self.timelines.pop(g, None)
+            else:
+                self.timelines[g] = timeline
+        for pos, values in undo['ev'].items():
+            for name, value in zip(FIELDS, values):
+                getattr(self, name)[pos] = value
+        self.score = undo['score']
+        self.fingerprint = undo['fingerprint']
+        self._dirty.clear()
+        self._undo = None
+
+    def _log_ev(self, pos):
+        if self._undo is not None and pos not in self._undo['ev']:
+            self._undo['ev'][pos] = tuple(getattr(self, name)[pos] for name in FIELDS)
+
+    def _log_slot(self, g):
+        if self._undo is not None and g not in self._undo['slot']:
+            timeline = self.timelines.get(g)
+            self._undo['slot'][g] = timeline.copy() if timeline is not None else None
+
+    def movable(self):
+        # Posisi EV yang assigned dan bukan jadwal tetap
+        return np.flatnonzero(self.assigned & ~self.instance.fixed)
+
+    def ev_score(self, pos):
+        return float(swap_score(
+            self.received_battery[pos], self.received_battery_cycle[pos],
+            self.exchanged_battery[pos], self.exchanged_battery_cycle[pos],
+            self.waiting_time[pos], self.instance.objective,
+        ))
+
+    def timeline(self, g):
+        timeline = self.timelines.get(g)
+        if timeline is None:
+            timeline = self.timelines[g] = SlotTimeline(self.instance.slot_base[g])
+        return timeline
+
+    def _key(self, pos):
+        return (float(self.travel_time[pos]), self.instance.id_rank[pos])
+
+    def _leave_slot(self, pos):
+        if not self.assigned[pos]:
+            return
+        g = self.instance.slot_index(self.station[pos], self.slot[pos])
+        self._log_slot(g)
+        self.timeline(g).remove(self._key(pos), pos)
+        self.slot_version[g] += 1
+        self.fingerprint ^= self.instance.zobrist(pos, g)
+        self._dirty.add(g)
+        self.score -= self.ev_score(pos)
+
+    def move(self, pos, station_idx, slot_idx):
+        inst = self.instance
+        self._log_ev(pos)
+        self._leave_slot(pos)
+
+        self.assigned[pos] = True
+        self.station[pos] = station_idx
+        self.slot[pos] = slot_idx
+        self.energy_distance[pos] = inst.energy_distance[pos, station_idx]
+        self.travel_time[pos] = inst.travel_time[pos, station_idx]
+        self.waiting_time[pos] = 0  # akan diupdate
+        self.exchanged_battery[pos] = inst.exchanged_battery[pos, station_idx]
+        self.received_battery[pos] = 0  # akan diupdate
+        self.exchanged_battery_cycle[pos] = inst.battery_cycle[pos]
+        self.received_battery_cycle[pos] = 0  # akan diupdate
+        self.score += self.ev_score(pos)
+
+        g = inst.slot_index(station_idx, slot_idx)
+        self._log_slot(g)
+        self.timeline(g).insert(self._key(pos), pos, float(self.exchanged_battery[pos]), float(inst.battery_cycle[pos]))
+        self.slot_version[g] += 1
+        self.fingerprint ^= inst.zobrist(pos, g)
+        self._dirty.add(g)
+
+    def move_fingerprint(self, pos, g):
+        # Fingerprint solusi jika EV pos dipindah ke slot g, tanpa mengubah solusi
+        inst = self.instance
+        fingerprint = self.fingerprint ^ inst.zobrist(pos, g)
+        if self.assigned[pos]:
+            fingerprint ^= inst.zobrist(pos, inst.slot_index(self.station[pos], self.slot[pos]))
+        return fingerprint
+
+    def unassign(self, pos):
+        self._log_ev(pos)
+        self._leave_slot(pos)
+        self.assigned[pos] = False
+        self.station[pos] = -1
+        self.slot[pos] = -1
+        for name in FIELDS[3:]:
+            getattr(self, name)[pos] = 0
+
+    def settle_slot(self, g):
+        # Hitung ulang antrian slot mulai dari EV pertama yang berubah, skor diperbarui per EV
+        inst = self.instance
+        changed = self.timeline(g).settle(inst.charging_rate, inst.required_battery_threshold, inst.objective)
+        for pos, waiting_time, received_battery, received_battery_cycle in changed:
+            self._log_ev(pos)
+            self.score -= self.ev_score(pos)
+            self.waiting_time[pos] = round(waiting_time, 2)
+            self.received_battery[pos] = round(received_battery, 2)
+            self.received_battery_cycle[pos] = round(received_battery_cycle, 2)
+            self.score += self.ev_score(pos)
+        self._dirty.discard(g)
+
+    def _settled_timeline(self, g):
+        if g in self._dirty:
+            self.settle_slot(g)
+        return self.timeline(g)
+
+    def query_insertion(self, pos, g):
+        # (waiting_time, received_battery, received_battery_cycle) jika EV pos disisipkan ke slot g
+        inst = self.instance
+        key = (float(inst.travel_time[pos, inst.slot_station[g]]), inst.id_rank[pos])
+        return self._settled_timeline(g).query(key, inst.charging_rate, inst.required_battery_threshold)
+
+    def insertion_deltas(self, pos, options):
+        # Perubahan skor solusi jika EV pos (belum assigned) disisipkan ke tiap slot dalam options
+        inst = self.instance
+        travel_time = inst.travel_time[pos].tolist()
+        exchanged_battery = inst.exchanged_battery[pos].tolist()
+        battery_cycle = float(inst.battery_cycle[pos])
+        rank = inst.id_rank[pos]
+        deltas = []
+        for g, station_idx in zip(options.tolist(), inst.slot_station[options].tolist()):
+            deltas.append(self._settled_timeline(g).insertion_delta(
+                (travel_time[station_idx], rank), exchanged_battery[station_idx], battery_cycle,
+                inst.charging_rate, inst.required_battery_threshold, inst.objective
+            ))
+        return deltas
+
+    def move_deltas(self, moves):
+        # Perubahan skor tiap kandidat (pos, slot tujuan) tanpa mengubah solusi, slot tujuan
+        # harus berbeda dari slot EV sekarang
+        inst = self.instance
+        deltas = np.empty(len(moves))
+        for n, (pos, g) in enumerate(moves):
+            current = inst.slot_index(self.station[pos], self.slot[pos])
+            station_idx = inst.slot_station[g]
+            deltas[n] = self._settled_timeline(current).removal_delta(
+                self._key(pos), pos, inst.charging_rate, inst.required_battery_threshold, inst.objective
+            ) + self._settled_timeline(g).insertion_delta(
+                (float(inst.travel_time[pos, station_idx]), inst.id_rank[pos]),
+                float(inst.exchanged_battery[pos, station_idx]), float(inst.battery_cycle[pos]),
+                inst.charging_rate, inst.required_battery_threshold, inst.objective
+            )
+        return deltas
+
+    def update_queues(self):
+        # Delta: hanya slot yang disentuh move/unassign sejak update terakhir
+        for g in list(self._dirty):
+            self.settle_slot(g)
+        return self.score
+
+    def refresh(self):
+        # Bangun ulang seluruh timeline dan hitung skor dari awal
+        inst = self.instance
+        self.timelines = {}
+        for pos in self.movable():
+            g = inst.slot_index(self.station[pos], self.slot[pos])
+            self.timeline(g).insert(self._key(pos), pos, float(self.exchanged_battery[pos]), float(inst.battery_cycle[pos]))
+        for g in self.timelines:
+            self.settle_slot(g)
+        self._dirty.clear()
+        self.score = evaluate_solution(self)
+        return self.score
+
+    def to_dict(self):
+        # Format jadwal per EV yang dipakai API dan simulasi
+        inst = self.instance
+        result = {}
+        for pos, ev_id in enumerate(inst.ev_ids):
+            data = inst.ev[ev_id]
+            if inst.fixed[pos]:
+                result[ev_id] = copy.deepcopy(data['swap_schedule'])
+            elif self.assigned[pos]:
+                result[ev_id] = {
+                    'assigned': True,
+                    'swap_id': None,
+                    'battery_now': data['battery_now'],
+                    'battery_cycle': data['battery_cycle'],
+                    'battery_station': int(self.station[pos]),
+                    'slot': int(self.slot[pos]),
+                    'energy_distance': float(self.energy_distance[pos]),
+                    'travel_time': float(self.travel_time[pos]),
+                    'waiting_time': float(self.waiting_time[pos]),
+                    'exchanged_battery': float(self.exchanged_battery[pos]),
+                    'received_battery': float(self.received_battery[pos]),
+                    'exchanged_battery_cycle': data['battery_cycle'],
+                    'received_battery_cycle': float(self.received_battery_cycle[pos]),
+                    'status': 'on going',
+                    'scheduled_time': None,
+                }
+            else:
+                result[ev_id] = {
+                    'assigned': False,
+                    'swap_id': None,
+                    'battery_now': data['battery_now'],
+                    'battery_cycle': data['battery_cycle'],
+                    'battery_station': None,
+                    'slot': None,
+                    'energy_distance': None,
+                    'travel_time': None,
+                    'waiting_time': None,
+                    'exchanged_battery': None,
+                    'received_battery': None,
+                    'exchanged_battery_cycle': None,
+                    'received_battery_cycle': None,
+                    'status': None,
+                    'scheduled_time': None,
+                }
+        return result
@@ -0,0 +1,137 @@
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .algorithm import annealing_step
+from .budget import SearchBudget
+from .constructive import INITIALIZERS
+from .solution import Instance, Solution
+from .warm_start import warm_start_initialization
+
+# Instance milik proses worker, dikirim sekali lewat initializer (bukan per ronde)
+_instance = None
+
+
+def _init_worker(instance):
+    global _instance
+    _instance = instance
+
+
+def temperature_ladder(n_replicas, T_max=100.0, T_min=0.1):
+    # Suhu geometris dari terdingin ke terpanas, rasio antar tetangga konstan
+    if n_replicas == 1:
+        return [T_min]
+    return list(np.geomspace(T_min, T_max, n_replicas))
+
+
+def _run_replica(station, slot, T, n_steps, seed, deadline, delta_evaluation, batch_size):
+    # Satu ronde Metropolis pada suhu tetap, dikembalikan state akhir dan yang terbaik
+    random.seed(seed)
+    solution = Solution.from_assignment(_instance, station, slot)
+    best_station, best_slot, best_score = solution.station.copy(), solution.slot.copy(), solution.score
+    for _ in range(n_steps):
+        if deadline is not None and time.time() >= deadline:
+            break
+        if annealing_step(solution, _instance, T, delta_evaluation, batch_size):
+            if solution.score > best_score:
+                best_station, best_slot, best_score = solution.station.copy(), solution.slot.copy(), solution.score
+
+    return {
+        'station': solution.station,
+        'slot': solution.slot,
+        'score': solution.score,
+        'best_station': best_station,
+        'best_slot': best_slot,
+        'best_score': best_score,
+    }
+
+
+def parallel_tempering(
+    battery_swap_station,
+    ev,
+    threshold,
+    charging_rate,
+    required_battery_threshold=80,
+    max_iter=1000,
+    n_replicas=None,
+    max_workers=None,
+    T_max=100.0,
+    T_min=0.1,
+    exchange_interval=200,
+    seed=None,
+    delta_evaluation=True,
+    batch_size=1,
+    time_budget_ms=None,
+    stagnation_limit=None,
+    callback=None,
+    previous_schedule=None,
+    initialization='greedy',
+    objective=None
+):
+    # Replica exchange: tiap replika SA berjalan pada suhu tetap di proses worker, setiap
+    # exchange_interval langkah state replika bersebelahan ditukar dengan kriteria Metropolis.
+    # max_iter dan stagnation_limit dihitung per ronde pertukaran
+    deadline = None if time_budget_ms is None else time.time() + time_budget_ms / 1000
+    budget = SearchBudget(max_iter, time_budget_ms, stagnation_limit)
+    instance = Instance(battery_swap_station, ev, charging_rate, required_battery_threshold, objective)
+    n_replicas = n_replicas or os.cpu_count() or 1
+    max_workers = min(max_workers or os.cpu_count() or 1, n_replicas)
+    temperatures = temperature_ladder(n_replicas, T_max, T_min)
+    rng = random.Random(seed)
+
+    # Semua replika mulai dari warm start atau solusi konstruktif yang sama,
+    # kecuali initialization='random' yang diacak per replika
+    shared = None
+    if previous_schedule:
+        shared = warm_start_initialization(instance, previous_schedule)
+    elif initialization != 'random':
+        shared = INITIALIZERS[initialization](instance)
+    states = []
+    for _ in range(n_replicas):
+        if shared is not None:
+            initial = shared
+        else:
+            random.seed(rng.randrange(2**32))
+            initial = INITIALIZERS['random'](instance)
+        states.append({'station': initial.station, 'slot': initial.slot, 'score': initial.score})
+
+    best_result = max(states, key=lambda s: s['score'])
+    best_station, best_slot, best_score = best_result['station'], best_result['slot'], best_result['score']
+    history = []
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(instance,)) as executor:
+        for round_idx in itertools.count():
+            if budget.exhausted(round_idx):
+                break
+
+            futures = [
+                executor.submit(
+                    _run_replica, state['station'], state['slot'], T, exchange_interval,
+                    rng.randrange(2**32), deadline, delta_evaluation, batch_size
+                )
+                for state, T in zip(states, temperatures)
+            ]
+            states = [future.result() for future in futures]
+
+            improved = False
+            for state in states:
+                if state['best_score'] > best_score:
+                    best_station, best_slot, best_score = state['best_station'], state['best_slot'], state['best_score']
+                    improved = True
+            budget.record(improved)
+
+            # Pertukaran bergantian pasangan genap/ganjil supaya state bisa berjalan ke seluruh tangga
+            for i in range(round_idx % 2, n_replicas - 1, 2):
+                exponent = (1 / temperatures[i] - 1 / temperatures[i + 1]) * (states[i + 1]['score'] - states[i]['score'])
+                if exponent >= 0 or rng.random() < math.exp(exponent):
+                    states[i], states[i + 1] = states[i + 1], states[i]
+
+            if callback:
+                callback(round_idx, best_score, states[0]['score'])
+            history.append(best_score)
+
+    best = Solution.from_assignment(instance, best_station, best_slot)
+    return best, best.score, history
@@ -0,0 +1,170 @@
+from bisect import bisect_left
+import numpy as np
+from .evaluation import DEFAULT_OBJECTIVE, swap_score
+
+
+def handover(state, arrival_time, charging_rate, required_battery_threshold=80):
+    # Waiting time dan baterai yang diterima EV yang tiba saat slot dalam kondisi state
+    last_ready_time, last_insert, last_insert_cycle = state
+    time_to_80 = max(0, (required_battery_threshold - last_insert) / charging_rate)
+    ready_time = last_ready_time + time_to_80
+    waiting_time = max(0, ready_time - arrival_time)
+
+    received_battery = min(100, last_insert + (arrival_time + waiting_time - last_ready_time) * charging_rate)
+    received_battery_cycle = last_insert_cycle + (received_battery - last_insert) / 100
+    return waiting_time, received_battery, received_battery_cycle
+
+
+def handover_score(waiting_time, received_battery, received_battery_cycle, battery, cycle, objective=DEFAULT_OBJECTIVE):
+    # Skor swap dari hasil handover dengan pembulatan 2 desimal yang sama seperti nilai yang
+    # disimpan di Solution, supaya delta sama persis dengan perubahan Solution.score.
+    # Rantai antrian (waktu serah-terima) tetap memakai nilai tanpa pembulatan
+    return swap_score(round(received_battery, 2), round(received_battery_cycle, 2), battery, cycle, round(waiting_time, 2), objective)
+
+
+def handover_arrays(last_ready_time, last_insert, last_insert_cycle, arrival_time, charging_rate, required_battery_threshold=80):
+    # Versi vektor dari handover, satu elemen per pasangan (kondisi slot, EV yang tiba)
+    time_to_80 = np.maximum(0, (required_battery_threshold - last_insert) / charging_rate)
+    waiting_time = np.maximum(0, last_ready_time + time_to_80 - arrival_time)
+    received_battery = np.minimum(100, last_insert + (arrival_time + waiting_time - last_ready_time) * charging_rate)
+    received_battery_cycle = last_insert_cycle + (received_battery - last_insert) / 100
+    return waiting_time, received_battery, received_battery_cycle
+
+
+class SlotTimeline:
+    # Antrian satu slot, terurut berdasarkan key (travel_time, urutan ev_id), beserta kondisi
+    # serah-terima setelah tiap EV: waktu baterainya masuk ke slot, level dan cycle-nya.
+    # Kondisi sebelum EV ke-i hanya bergantung pada EV ke-(i-1), jadi query cukup bisect.
+    __slots__ = ('base', 'keys', 'positions', 'end_time', 'battery', 'cycle', 'scores', 'dirty_from', 'pending')
+
+    def __init__(self, base):
+        self.base = base  # (last_ready_time, last_insert, last_insert_cycle) sebelum antrian
+        self.keys = []
+        self.positions = []
+        self.end_time = []  # None berarti belum dihitung sejak berubah
+        self.battery = []
+        self.cycle = []
+        self.scores = []  # skor swap tiap EV, dari nilai yang dibulatkan seperti di Solution
+        # Indeks terkecil yang perlu dihitung ulang, dan jumlah entri bertanda None
+        self.dirty_from = None
+        self.pending = 0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def copy(self):
+        other = SlotTimeline(self.base)
+        other.keys = self.keys.copy()
+        other.positions = self.positions.copy()
+        other.end_time = self.end_time.copy()
+        other.battery = self.battery.copy()
+        other.cycle = self.cycle.copy()
+        other.scores = self.scores.copy()
+        other.dirty_from = self.dirty_from
+        other.pending = self.pending
+        return other
+
+    def _mark(self, i):
+        if self.dirty_from is None or i < self.dirty_from:
+            self.dirty_from = i
+
+    def insert(self, key, pos, battery, cycle):
+        i = bisect_left(self.keys, key)
+        self.keys.insert(i, key)
+        self.positions.insert(i, pos)
+        self.end_time.insert(i, None)
+        self.battery.insert(i, battery)
+        self.cycle.insert(i, cycle)
+        self.scores.insert(i, 0.0)
+        self.pending += 1  # entri baru belum punya waktu serah-terima
+        self._mark(i)
+
+    def remove(self, key, pos):
+        i = bisect_left(self.keys, key)
+        while self.positions[i] != pos:
+            i += 1
+        if self.end_time[i] is None:
+            self.pending -= 1
+        del self.keys[i], self.positions[i], self.end_time[i], self.battery[i], self.cycle[i], self.scores[i]
+        # EV sesudahnya sekarang punya pendahulu baru, wajib dihitung ulang
+        if i < len(self.end_time) and self.end_time[i] is not None:
+            self.end_time[i] = None
+            self.pending += 1
+        self._mark(i)
+
+    def state_before(self, i):
+        if i == 0:
+            return self.base
+        return self.end_time[i - 1], self.battery[i - 1], self.cycle[i - 1]
+
+    def query(self, key, charging_rate, required_battery_threshold=80):
+        # Waiting time dan baterai yang diterima jika EV dengan key ini disisipkan sekarang.
+        # Hanya valid jika timeline sudah settle
+        i = bisect_left(self.keys, key)
+        return handover(self.state_before(i), key[0], charging_rate, required_battery_threshold)
+
+    def insertion_delta(self, key, battery, cycle, charging_rate, required_battery_threshold=80, objective=DEFAULT_OBJECTIVE):
+        # Perubahan total skor slot jika EV disisipkan: skor EV itu sendiri ditambah selisih
+        # skor EV sesudahnya yang ikut bergeser, berhenti saat waktu serah-terima kembali sama
+        i = bisect_left(self.keys, key)
+        waiting_time, received_battery, received_battery_cycle = handover(
+            self.state_before(i), key[0], charging_rate, required_battery_threshold
+        )
+        delta = handover_score(waiting_time, received_battery, received_battery_cycle, battery, cycle, objective)
+        state = (key[0] + waiting_time, battery, cycle)
+        for j in range(i, len(self.positions)):
+            arrival_time = self.keys[j][0]
+            waiting_time, received_battery, received_battery_cycle = handover(
+                state, arrival_time, charging_rate, required_battery_threshold
+            )
+            delta += handover_score(waiting_time, received_battery, received_battery_cycle, self.battery[j], self.cycle[j], objective) - self.scores[j]
+            end_time = arrival_time + waiting_time
+            if end_time == self.end_time[j]:
+                break
+            state = (end_time, self.battery[j], self.cycle[j])
+        return delta
+
+    def removal_delta(self, key, pos, charging_rate, required_battery_threshold=80, objective=DEFAULT_OBJECTIVE):
+        # Perubahan total skor slot jika EV pos dikeluarkan: skornya hilang dan EV sesudahnya maju
+        i = bisect_left(self.keys, key)
+        while self.positions[i] != pos:
+            i += 1
+        delta = -self.scores[i]
+        state = self.state_before(i)
+        for j in range(i + 1, len(self.positions)):
+            arrival_time = self.keys[j][0]
+            waiting_time, received_battery, received_battery_cycle = handover(
+                state, arrival_time, charging_rate, required_battery_threshold
+            )
+            delta += handover_score(waiting_time, received_battery, received_battery_cycle, self.battery[j], self.cycle[j], objective) - self.scores[j]
+            end_time = arrival_time + waiting_time
+            if end_time == self.end_time[j]:
+                break
+            state = (end_time, self.battery[j], self.cycle[j])
+        return delta
+
+    def settle(self, charging_rate, required_battery_threshold=80, objective=DEFAULT_OBJECTIVE):
+        # Hitung ulang dari indeks terkecil yang berubah. Berhenti saat waktu serah-terima
+        # sama dengan sebelumnya dan tidak ada entri baru lagi, karena EV sesudahnya tidak terpengaruh
+        if self.dirty_from is None:
+            return []
+        changed = []
+        state = self.state_before(self.dirty_from)
+        for i in range(self.dirty_from, len(self.positions)):
+            arrival_time = self.keys[i][0]
+            waiting_time, received_battery, received_battery_cycle = handover(
+                state, arrival_time, charging_rate, required_battery_threshold
+            )
+            changed.append((self.positions[i], waiting_time, received_battery, received_battery_cycle))
+            self.scores[i] = handover_score(waiting_time, received_battery, received_battery_cycle, self.battery[i], self.cycle[i], objective)
+
+            end_time = arrival_time + waiting_time
+            previous = self.end_time[i]
+            self.end_time[i] = end_time
+            if previous is None:
+                self.pending -= 1
+            elif previous == end_time and self.pending == 0:
+                break
+            state = (end_time, self.battery[i], self.cycle[i])
+        self.dirty_from = None
+        return changed
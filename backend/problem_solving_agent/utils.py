@@ -1,305 +1,136 @@
-import copy
 import random
-import requests
-import math
-import time
-
-OSRM_URL = "http://host.docker.internal:5000"
-
-def queue_update(solution, ev, battery_swap_station, charging_rate, required_battery_threshold=80):
-    slot_timeline = {}
-    station_batteries = copy.deepcopy(battery_swap_station)
-
-    swaps = []
-
-    # Kumpulkan semua jadwal tetap dari ev['swap_schedule']
-    temp_queue = {}
-
-    for ev_id, data in ev.items():
-        sched = copy.deepcopy(data.get('swap_schedule'))
-        if sched and sched.get('assigned'):
-            key = (sched['battery_station'], sched['slot'])
-            ready_time = sched['travel_time'] + sched['waiting_time']
-            exchanged_battery = sched['exchanged_battery']
-            exchanged_battery_cycle = sched['battery_cycle']
-
-            if key not in temp_queue:
-                temp_queue[key] = [(ready_time, exchanged_battery, exchanged_battery_cycle)]
-            else:
-                temp_queue[key].append((ready_time, exchanged_battery, exchanged_battery_cycle))
-
-    # Urutkan setiap antrian berdasarkan arrival_time
-    slot_timeline = {
-        key: sorted(entries, key=lambda x: x[0])
-        for key, entries in temp_queue.items()
-    }
-
-    # Kumpulkan EV dari solusi yang assigned, tapi hanya yang tidak punya jadwal tetap
-    for ev_id, sched in solution.items():
-        if sched['assigned'] and not ev[ev_id]['swap_schedule']:
-            arrival_time = sched['travel_time']
-            key = (sched['battery_station'], sched['slot'])
-            swaps.append((arrival_time, ev_id, key))
-
-    # Urutkan berdasarkan arrival_time (yang datang duluan diproses lebih dulu)
-    swaps.sort()
-
-    # Proses masing-masing EV, hitung ulang waiting_time dan received_battery
-    for _, ev_id, key in swaps:
-        sched = solution[ev_id]
-        station_idx, slot_idx = key
-
-        if key not in slot_timeline:
-            last_ready_time = 0
-            last_insert = battery_swap_station[station_idx][slot_idx][0]
-            last_insert_cycle = battery_swap_station[station_idx][slot_idx][1]
-        else:
-            last_ready_time, last_insert, last_insert_cycle = slot_timeline[key][-1]
-
-        arrival_time = sched['travel_time']
-        time_to_80 = max(0, (required_battery_threshold - last_insert) / charging_rate)
-        ready_time = last_ready_time + time_to_80
-        waiting_time = max(0, ready_time - arrival_time)
-
-        exchanged_battery = sched['exchanged_battery']
-        received_battery = min(100, last_insert + (arrival_time + waiting_time - last_ready_time) * charging_rate)
-        exchanged_battery_cycle = sched['battery_cycle']
-        received_battery_cycle = last_insert_cycle + (received_battery - last_insert) / 100
-
-        # Update ke dalam solution
-        solution[ev_id]['waiting_time'] = round(waiting_time, 2)
-        solution[ev_id]['received_battery'] = round(received_battery, 2)
-        solution[ev_id]['received_battery_cycle'] = round(received_battery_cycle, 2)
-
-        # Tambahkan ke slot_timeline untuk update antrian selanjutnya
-        if key not in slot_timeline:
-            slot_timeline[key] = [(arrival_time + waiting_time, exchanged_battery, exchanged_battery_cycle)]
-        else:
-            slot_timeline[key].append((arrival_time + waiting_time, exchanged_battery, exchanged_battery_cycle))
-
-    return solution
-
-def get_neighbor_simulated_annealing(solution, ev, battery_swap_station, charging_rate, threshold=15, required_battery_threshold=80):
-    neighbor = copy.deepcopy(solution)
-
-    # Ambil daftar EV yang assigned di solution tetapi tidak punya swap_schedule tetap di ev
-    movable_ev_ids = [
-        ev_id for ev_id in neighbor
-        if neighbor[ev_id] and neighbor[ev_id].get("assigned") and not ev[ev_id].get("swap_schedule")
-    ]
-
-    if not movable_ev_ids:
+import numpy as np
+from .geo import haversine_km
+from .routing import RouteMatrix, nearest_k
+
+def get_neighbor_simulated_annealing(solution, instance, delta_evaluation=True):
+    # Tetangga dibuat langsung di solution, pemanggil yang melakukan begin/rollback
+    neighbor = solution
+
+    # Ambil daftar EV yang assigned di solution tetapi tidak punya swap_schedule tetap
+    movable = neighbor.movable()
+
+    if len(movable) == 0:
         return neighbor  # Tidak ada yang bisa diubah
 
     # Pilih satu EV secara acak dari yang bisa diubah
-    ev_id = random.choice(movable_ev_ids)
-    data = ev[ev_id]
+    pos = random.choice(list(movable))
 
-    # Cari opsi stasiun-slot valid untuk EV ini
-    valid_options = []
-    for station_idx, (ed, tt) in enumerate(zip(data['energy_distance'], data['travel_time'])):
-        if data['battery_now'] - ed < 0:
-            continue
-        for slot_idx in range(len(battery_swap_station[station_idx])):
-            valid_options.append((station_idx, slot_idx, ed, tt))
+    # Opsi stasiun-slot valid untuk EV ini
+    options = instance.options(pos)
 
-    if not valid_options:
+    if not len(options):
         # Jika tidak ada opsi valid, set jadi unassigned
-        neighbor[ev_id] = {
-            'assigned': False,
-            'swap_id': None,
-            'battery_now': data['battery_now'],
-            'battery_cycle': data['battery_cycle'],
-            'battery_station': None,
-            'slot': None,
-            'energy_distance': None,
-            'travel_time': None,
-            'waiting_time': None,
-            'exchanged_battery': None,
-            'received_battery': None,
-            'received_battery_cycle': None,
-            'status': None,
-            'scheduled_time': None,
-        }
+        neighbor.unassign(pos)
     else:
         # Acak salah satu pilihan valid
-        station_idx, slot_idx, energy_dist, travel_time = random.choice(valid_options)
-        exchanged_battery = data['battery_now'] - energy_dist
-        neighbor[ev_id] = {
-            'assigned': True,
-            'swap_id': None,
-            'battery_now': data['battery_now'],
-            'battery_cycle': data['battery_cycle'],
-            'battery_station': station_idx,
-            'slot': slot_idx,
-            'energy_distance': energy_dist,
-            'travel_time': travel_time,
-            'waiting_time': 0,  # akan diupdate
-            'exchanged_battery': exchanged_battery,
-            'received_battery': 0,  # akan diupdate
-            'received_battery_cycle': 0, # akan diupdate
-            'status': 'on going',
-            'scheduled_time': None,
-        }
+        g = options[random.randrange(len(options))]
+        neighbor.move(pos, *instance.slot_key(g))
 
     # Update ulang nilai waiting_time dan received_battery setelah perubahan
-    neighbor = queue_update(neighbor, ev, battery_swap_station, charging_rate, required_battery_threshold)
+    if delta_evaluation:
+        neighbor.update_queues()
+    else:
+        neighbor.refresh()
     return neighbor
 
-def get_distance_and_duration(origin_lat, origin_lon, destination_lat, destination_lon):
-    try:
-        url = f"{OSRM_URL}/route/v1/driving/{origin_lon},{origin_lat};{destination_lon},{destination_lat}?overview=false"
-        response = requests.get(url, timeout=3)
-        data = response.json()
-
-        if data["code"] == "Ok":
-            route = data["routes"][0]
-            distance_km = max(route["distance"] / 1000, 0.000001)
-            duration_min = max(round(route["duration"] / (60 * 2), 2), 0.000001)
-            return distance_km, duration_min
-                    
-    except:
-        # Fallback to haversine calculation
-        return haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon)
-    
-    return haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon)
-        
-
-def haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon):
-    """Haversine distance calculation"""
-    R = 6371
-    lat1_rad, lon1_rad = math.radians(origin_lat), math.radians(origin_lon)
-    lat2_rad, lon2_rad = math.radians(destination_lat), math.radians(destination_lon)
-        
-    dlat, dlon = lat2_rad - lat1_rad, lon2_rad - lon1_rad
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-    distance_km = max(R * c, 0.000001)
-    duration_min = max((distance_km / 25) * 60, 0.000001)  # 25 km/h average for Jakarta
-        
-    return distance_km, duration_min
-
-def update_energy_distance_and_travel_time_all(fleet_ev_motorbikes, battery_swap_station):
+def sample_neighbor_moves(solution, instance, batch_size):
+    # K kandidat pemindahan satu EV ke slot valid lain, dinilai bersama oleh pemanggil
+    movable = solution.movable()
+    moves = []
+
+    if len(movable) == 0:
+        return moves
+
+    for _ in range(batch_size):
+        pos = int(movable[random.randrange(len(movable))])
+        options = instance.options(pos)
+        g = int(options[random.randrange(len(options))])
+
+        # Pindah ke slot yang sama bukan tetangga
+        if g != instance.slot_index(solution.station[pos], solution.slot[pos]):
+            moves.append((pos, g))
+
+    return moves
+
+def _route_legs(ev):
+    # Leg sebelum menuju stasiun (dipakai bersama oleh semua stasiun) dan titik awal leg terakhir
+    order = ev["order_schedule"]
+    current = (ev["current_lat"], ev["current_lon"])
+    if ev["status"] == "idle":
+        return [], current
+    if ev["status"] == "heading to order":
+        origin = (order.get("order_origin_lat"), order.get("order_origin_lon"))
+        destination = (order.get("order_destination_lat"), order.get("order_destination_lon"))
+        return [(current, origin), (origin, destination)], destination
+    if ev["status"] == "on order":
+        destination = (order.get("order_destination_lat"), order.get("order_destination_lon"))
+        return [(current, destination)], destination
+    return None, None
+
+def update_energy_distance_and_travel_time_all(fleet_ev_motorbikes, battery_swap_station, route_matrix=None, k=8, swap_threshold=25):
+    # Pra-seleksi k BSS terdekat per EV dengan matriks haversine EV x stasiun, lalu semua leg
+    # OSRM satu ronde dikumpulkan dan diselesaikan sekaligus lewat request /table.
+    # swap_threshold harus sama dengan ObjectiveConfig.swap_threshold, EV di atasnya bukan kandidat
+    route_matrix = route_matrix or RouteMatrix()
+    stations = list(battery_swap_station.values())
+    station_lat = np.array([station["lat"] for station in stations], dtype=np.float64)
+    station_lon = np.array([station["lon"] for station in stations], dtype=np.float64)
+    plans = []
+
     for ev in fleet_ev_motorbikes.values():
-        if ev.get("swap_schedule") or ev.get("battery_now") > 25:
+        if ev.get("swap_schedule") or ev.get("battery_now") > swap_threshold:
             continue
 
-        ev["energy_distance"] = []
-        ev["travel_time"] = []
-
-        station_list = [(sid, station) for sid, station in battery_swap_station.items()]
-        haversine_results = []
-
-        for station_id, station in station_list:
-            # Estimasi jarak awal
-            if ev["status"] == "idle":
-                start_lat, start_lon = ev["current_lat"], ev["current_lon"]
-                distance, _ = haversine_distance(start_lat, start_lon, station["lat"], station["lon"])
-
-            elif ev["status"] == "heading to order":
-                o_lat = ev["order_schedule"].get("order_origin_lat")
-                o_lon = ev["order_schedule"].get("order_origin_lon")
-                d_lat = ev["order_schedule"].get("order_destination_lat")
-                d_lon = ev["order_schedule"].get("order_destination_lon")
-
-                d1, _ = haversine_distance(ev["current_lat"], ev["current_lon"], o_lat, o_lon)
-                d2, _ = haversine_distance(o_lat, o_lon, d_lat, d_lon)
-                d3, _ = haversine_distance(d_lat, d_lon, station["lat"], station["lon"])
-
-                distance = d1 + d2 + d3
-                start_lat, start_lon = d_lat, d_lon
-
-            elif ev["status"] == "on order":
-                d_lat = ev["order_schedule"].get("order_destination_lat")
-                d_lon = ev["order_schedule"].get("order_destination_lon")
-
-                d1, _ = haversine_distance(ev["current_lat"], ev["current_lon"], d_lat, d_lon)
-                d2, _ = haversine_distance(d_lat, d_lon, station["lat"], station["lon"])
-                distance = d1 + d2
-                start_lat, start_lon = d_lat, d_lon
-
-            else:
-                continue
-
-            energy = round(distance * (100 / 65), 2)
-
-            haversine_results.append({
-                "station_id": station_id,
-                "station": station,
-                "energy": energy,
-                "start_lat": start_lat,
-                "start_lon": start_lon,
-            })
-
-        # Ambil 8 BSS terdekat
-        top8 = sorted(haversine_results, key=lambda x: x["energy"])[:8]
-
-        # Hitung ulang pakai OSRM hanya untuk 8
-        for t in top8:
-            if ev["status"] == 'idle':
-                d, dur = get_distance_and_duration(
-                    ev["current_lat"], ev["current_lon"],
-                    t["station"]["lat"], t["station"]["lon"]
-                )
-                t["energy"] = d * (100 / 65)
-                t["duration"] = dur
-
-            elif ev["status"] == 'heading to order':
-                d1, t1 = get_distance_and_duration(
-                    ev["current_lat"], ev["current_lon"],
-                    ev["order_schedule"]["order_origin_lat"],
-                    ev["order_schedule"]["order_origin_lon"]
-                )
-                e1 = d1 * (100 / 65)
-
-                d2, t2 = get_distance_and_duration(
-                    ev["order_schedule"]["order_origin_lat"],
-                    ev["order_schedule"]["order_origin_lon"],
-                    ev["order_schedule"]["order_destination_lat"],
-                    ev["order_schedule"]["order_destination_lon"]
-                )
-                e2 = d2 * (100 / 65)
-
-                d3, t3 = get_distance_and_duration(
-                    ev["order_schedule"]["order_destination_lat"],
-                    ev["order_schedule"]["order_destination_lon"],
-                    t["station"]["lat"],
-                    t["station"]["lon"]
-                )
-                e3 = d3 * (100 / 65)
-
-                t["energy"] = e1 + e2 + e3
-                t["duration"] = t1 + t2 + t3
-
-            elif ev["status"] == 'on order':
-                d1, t1 = get_distance_and_duration(
-                    ev["current_lat"], ev["current_lon"],
-                    ev["order_schedule"]["order_destination_lat"],
-                    ev["order_schedule"]["order_destination_lon"]
-                )
-                e1 = d1 * (100 / 65)
-
-                d2, t2 = get_distance_and_duration(
-                    ev["order_schedule"]["order_destination_lat"],
-                    ev["order_schedule"]["order_destination_lon"],
-                    t["station"]["lat"],
-                    t["station"]["lon"]
-                )
-                e2 = d2 * (100 / 65)
-
-                t["energy"] = e1 + e2
-                t["duration"] = t1 + t2
-
-        # Final: isi list berdasarkan ID
-        for station_id, _ in station_list:
-            match = next((t for t in top8 if t["station_id"] == station_id), None)
-            if match:
-                ev["energy_distance"].append(match["energy"])
-                ev["travel_time"].append(match["duration"])
-            else:
-                ev["energy_distance"].append(99999.0)
-                ev["travel_time"].append(99999.0)
+        pre_legs, start = _route_legs(ev)
+        # Status lain tidak punya stasiun terjangkau
+        plans.append((ev, pre_legs or [], start))
+
+    routable = [plan for plan in plans if plan[2] is not None]
+    if routable and stations:
+        # Estimasi jarak awal: leg sebelum stasiun + titik awal ke tiap stasiun
+        owner = np.array([i for i, plan in enumerate(routable) for _ in plan[1]], dtype=np.int64)
+        legs = np.array([a + b for plan in routable for a, b in plan[1]], dtype=np.float64).reshape(-1, 4)
+        pre_distance = np.bincount(
+            owner, weights=haversine_km(legs[:, 0], legs[:, 1], legs[:, 2], legs[:, 3]), minlength=len(routable)
+        )
+        start = np.array([plan[2] for plan in routable], dtype=np.float64)
+
+        # Per blok supaya matriks tetap kecil untuk armada besar
+        nearest = []
+        for lo in range(0, len(routable), 2048):
+            distance = haversine_km(
+                start[lo:lo + 2048, 0, None], start[lo:lo + 2048, 1, None], station_lat[None, :], station_lon[None, :]
+            )
+            energy = np.round((pre_distance[lo:lo + 2048, None] + distance) * (100 / 65), 2)
+            nearest.extend(nearest_k(energy, k))
+    else:
+        nearest = [[] for _ in routable]
+    top = {id(plan[0]): idx for plan, idx in zip(routable, nearest)}
+
+    # Hitung ulang pakai OSRM hanya untuk k BSS terdekat
+    for ev, pre_legs, start in plans:
+        for a, b in pre_legs:
+            route_matrix.add(a, b)
+        for s in top.get(id(ev), []):
+            route_matrix.add(start, (station_lat[s], station_lon[s]))
+
+    route_matrix.resolve()
+
+    for ev, pre_legs, start in plans:
+        pre = [route_matrix.get(a, b) for a, b in pre_legs]
+        pre_distance = sum(d for d, _ in pre)
+        pre_duration = sum(dur for _, dur in pre)
+
+        # Final: isi list berdasarkan urutan stasiun, 99999.0 untuk yang tidak terpilih
+        energy_distance = np.full(len(stations), 99999.0)
+        travel_time = np.full(len(stations), 99999.0)
+        for s in top.get(id(ev), []):
+            d, dur = route_matrix.get(start, (station_lat[s], station_lon[s]))
+            energy_distance[s] = (pre_distance + d) * (100 / 65)
+            travel_time[s] = pre_duration + dur
+        ev["energy_distance"] = energy_distance.tolist()
+        ev["travel_time"] = travel_time.tolist()
 
 def convert_fleet_ev_motorbikes_to_dict(fleet_ev_motorbikes):
     ev_dict = {}
@@ -382,7 +213,7 @@ def get_station_dict_from_list(battery_swap_stations, batteries):
     return station_dict
 
 
-def get_fleet_dict_and_station_list(fleet_ev_motorbikes, schedules, orders, battery_swap_stations, batteries):
+def get_fleet_dict_and_station_list(fleet_ev_motorbikes, schedules, orders, battery_swap_stations, batteries, swap_threshold=25):
     fleet_dict = {}
     station_list = {}
 
@@ -448,7 +279,7 @@ def get_fleet_dict_and_station_list(fleet_ev_motorbikes, schedules, orders, batt
     fleet_dict = dict(sorted(fleet_dict.items()))
     station_dict = dict(sorted(station_dict.items()))
 
-    update_energy_distance_and_travel_time_all(fleet_dict, station_dict)
+    update_energy_distance_and_travel_time_all(fleet_dict, station_dict, swap_threshold=swap_threshold)
     fleet_dict = convert_fleet_ev_motorbikes_to_dict(fleet_dict)
     station_list = convert_station_dict_to_list(station_dict)    
 
@@ -0,0 +1,34 @@
+import numpy as np
+from .insertion import regret_insertion
+from .solution import Solution
+
+def warm_start_initialization(instance, previous_schedule, travel_time_tolerance=5.0):
+    # Mulai dari jadwal ronde sebelumnya (format to_dict): EV yang slotnya masih layak dan
+    # travel_time-nya tidak bergeser jauh tetap di slot lama, sisanya disisipkan ulang
+    solution = Solution(instance)
+    to_insert = []
+
+    for pos in np.flatnonzero(instance.candidate):
+        sched = previous_schedule.get(instance.ev_ids[pos])
+        if not (sched and sched.get('assigned')):
+            to_insert.append(pos)
+            continue
+
+        station_idx, slot_idx = sched.get('battery_station'), sched.get('slot')
+        if not instance.valid_slot(station_idx, slot_idx) or not instance.feasible[pos, station_idx]:
+            to_insert.append(pos)
+            continue
+
+        # Rute berubah signifikan, posisi di antrian lama tidak lagi relevan
+        previous_travel_time = sched.get('travel_time')
+        if previous_travel_time is None or abs(instance.travel_time[pos, station_idx] - previous_travel_time) > travel_time_tolerance:
+            to_insert.append(pos)
+            continue
+
+        solution.move(pos, station_idx, slot_idx)
+
+    # EV baru atau yang bergeser ditaruh lewat regret insertion di atas antrian yang dipertahankan
+    regret_insertion(solution, instance, to_insert)
+
+    solution.refresh()
+    return solution
@@ -9,7 +9,12 @@ from database.routers import jadwal, pengemudi_dan_kendaraan, baterai, admin, st
 from database.models import Admin, Baterai, Kendaraan, Pengemudi, Order, StasiunPenukaranBaterai, SlotStasiunPenukaranBaterai, JadwalPenukaran
 from database import crud
 from problem_solving_agent.utils import update_energy_distance_and_travel_time_all, convert_fleet_ev_motorbikes_to_dict, convert_station_dict_to_list, get_fleet_dict_and_station_list
-from problem_solving_agent.algorithm import simulated_annealing, alns_ev_scheduler
+from problem_solving_agent.engines import ENGINES, solve
+from problem_solving_agent.constructive import INITIALIZERS
+from problem_solving_agent.evaluation import ObjectiveConfig
+from problem_solving_agent.profiler import SolverProfiler
+from problem_solving_agent.cache import ScoreCache
+import os
 import time
 from typing import Dict, Any, List
 from schemas import PenjadwalanRequest
@@ -43,6 +48,18 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# Batas solve penjadwalan agar latensi /api/jadwal-penukaran tetap terprediksi
+SCHEDULING_TIME_BUDGET_MS = 20000
+SCHEDULING_STAGNATION_LIMIT = 300
+# Jika diisi, laporan profiler tiap solve ditambahkan ke file ini (JSON lines)
+SCHEDULING_PROFILE_LOG = os.getenv("SCHEDULING_PROFILE_LOG")
+# Bobot objektif bersama semua engine, bisa diganti lewat JSON, misal
+# {"energy_gain_weight": 0.2, "waiting_time_weight": 0.8, "swap_threshold": 25}
+SCHEDULING_OBJECTIVE = ObjectiveConfig.from_dict(json.loads(os.getenv("SCHEDULING_OBJECTIVE", "{}")))
+
+# Jadwal terakhir yang dikembalikan per fleet, dipakai sebagai warm start ronde berikutnya
+last_schedules = {}
+
 # Helper
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -134,9 +151,33 @@ async def sync_battery_swap_system_data(request: Request):
     finally:
         db.close()
 
+# Fungsi biasa (bukan async): solve bersifat CPU-bound, jadi FastAPI menjalankannya di threadpool
+# supaya event loop (websocket dan endpoint lain) tidak tertahan selama solve
 @app.get("/api/jadwal-penukaran")
-async def get_jadwal_penukaran():
+def get_jadwal_penukaran(
+    chains: int = 1,
+    time_budget_ms: int = SCHEDULING_TIME_BUDGET_MS,
+    stagnation_limit: int = SCHEDULING_STAGNATION_LIMIT,
+    fleet_id: str = "default",
+    warm_start: bool = True,
+    decompose: bool = False,
+    profile: bool = False,
+    score_cache_size: int = 10000,
+    solver: str = "alns",
+    initialization: str = "random"
+):
     start = time.time()
+    # decompose dan chains > 1 tetap didukung sebagai pintasan varian ALNS
+    engine_name = solver
+    if solver == "alns" and decompose:
+        engine_name = "decomposition"
+    elif solver == "alns" and chains > 1:
+        engine_name = "parallel_alns"
+    if engine_name not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"Unknown solver '{solver}', available: {', '.join(sorted(ENGINES))}")
+    if initialization not in INITIALIZERS:
+        raise HTTPException(status_code=400, detail=f"Unknown initialization '{initialization}', available: {', '.join(sorted(INITIALIZERS))}")
+
     db = SessionLocal()
     try:
         fleet_ev_motorbikes = crud.get_all_motorbikes(db)
@@ -146,24 +187,70 @@ async def get_jadwal_penukaran():
         orders = crud.get_all_orders(db, status="on going")
 
         ev_dict, station_list = get_fleet_dict_and_station_list(
-            fleet_ev_motorbikes, schedules, orders, battery_swap_stations, batteries
+            fleet_ev_motorbikes, schedules, orders, battery_swap_stations, batteries,
+            swap_threshold=SCHEDULING_OBJECTIVE.swap_threshold
         )
 
-        schedule, score, history = alns_ev_scheduler(
-            battery_swap_station=station_list,
-            ev=ev_dict,
-            threshold=15,
-            charging_rate=100 / 240,
+        # Sisa budget setelah membangun data fleet dan rute dipakai untuk solve
+        data_prep_time = time.time() - start
+        solve_budget_ms = max(0, time_budget_ms - data_prep_time * 1000)
+        previous_schedule = last_schedules.get(fleet_id) if warm_start else None
+        # Profil hanya untuk solve satu rantai, mode paralel sudah melaporkan statistik per rantai
+        profiler = None
+        if (profile or SCHEDULING_PROFILE_LOG) and engine_name == "alns":
+            profiler = SolverProfiler('alns')
+
+        options = dict(
             required_battery_threshold=80,
-            max_iter=1000
+            max_iter=1000,
+            time_budget_ms=solve_budget_ms,
+            stagnation_limit=stagnation_limit,
+            previous_schedule=previous_schedule,
+            objective=SCHEDULING_OBJECTIVE
         )
+        if engine_name == "alns":
+            # Assignment yang sudah pernah dinilai tidak dievaluasi ulang, 0 = nonaktif
+            options.update(
+                profiler=profiler,
+                score_cache=ScoreCache(score_cache_size) if score_cache_size > 0 else None,
+                initialization=initialization
+            )
+        elif engine_name == "parallel_alns":
+            # Multi-start ALNS paralel, satu rantai per proses
+            options.update(n_chains=chains, initialization=initialization)
+        elif engine_name == "tempering":
+            # Replica-exchange SA, satu replika suhu per proses (chains = jumlah replika)
+            options.update(max_iter=None, n_replicas=chains if chains > 1 else None, initialization=initialization)
+        elif engine_name == "sa":
+            options.update(max_iter=None, initialization=initialization)
+        elif engine_name in ("ga", "gwo", "iga", "prec"):
+            # Engine populasi, fitness populasi dinilai paralel jika chains > 1
+            options.update(max_iter=None, initialization=initialization, max_workers=chains)
+
+        schedule, score, info = solve(engine_name, station_list, ev_dict, 15, 100 / 240, **options)
+        # Mode paralel dan dekomposisi mengembalikan statistik per rantai / cluster
+        chain_stats = info if engine_name in ("parallel_alns", "decomposition") else []
+
+        schedule_dict = schedule.to_dict()
+        last_schedules[fleet_id] = schedule_dict
 
         execution_time = time.time() - start
-        return {
-            "schedule": schedule,
+        response = {
+            "schedule": schedule_dict,
             "score": score,
-            "execution_time": execution_time
+            "execution_time": execution_time,
+            "chains": [
+                {key: value for key, value in stats.items() if key != "history"}
+                for stats in chain_stats
+            ]
         }
+
+        if profiler:
+            if SCHEDULING_PROFILE_LOG:
+                profiler.write_jsonl(SCHEDULING_PROFILE_LOG, fleet_id=fleet_id, data_prep_time=data_prep_time)
+            if profile:
+                response["profile"] = profiler.report()
+        return response
     finally:
         db.close()
 
@@ -181,6 +268,7 @@ def clear_all_data():
         db.query(Baterai).delete()
 
         db.commit()
+        last_schedules.clear()  # warm start lama tidak berlaku untuk data baru
         return {"message": "Semua data berhasil dihapus, kecuali data admin."}
     except Exception as e:
         db.rollback()
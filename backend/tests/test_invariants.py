@@ -0,0 +1,87 @@
+import random
+import numpy as np
+import pytest
+from benchmark.generator import generate_instance
+from problem_solving_agent.engines import ENGINES, solve
+from problem_solving_agent.evaluation import evaluate, evaluate_solution
+from problem_solving_agent.random_initialization import random_initialization
+from problem_solving_agent.solution import FIELDS, Instance
+from problem_solving_agent.utils import sample_neighbor_moves
+
+CHARGING_RATE = 100 / 240
+
+
+@pytest.fixture(scope='module')
+def generated():
+    # Instance sintetis kecil dari generator benchmark (termasuk jadwal tetap)
+    return generate_instance(150, 15, seed=7, fixed_share=0.1)
+
+
+@pytest.fixture
+def solution(generated):
+    random.seed(0)
+    instance = Instance(*generated, CHARGING_RATE)
+    solution = random_initialization(instance)
+    solution.refresh()
+    return solution
+
+
+def snapshot(solution):
+    # Semua state yang harus kembali sama setelah rollback
+    timelines = {
+        g: (list(t.keys), list(t.positions), list(t.end_time), list(t.scores))
+        for g, t in solution.timelines.items() if len(t)
+    }
+    return [getattr(solution, name).copy() for name in FIELDS], solution.score, solution.fingerprint, timelines
+
+
+def test_delta_matches_full_evaluation(solution):
+    instance = solution.instance
+    random.seed(1)
+    for _ in range(200):
+        moves = sample_neighbor_moves(solution, instance, 4)
+        if not moves:
+            continue
+        deltas = solution.move_deltas(moves)
+        before = solution.score
+        pos, g = moves[0]
+        solution.move(pos, *instance.slot_key(g))
+        solution.update_queues()
+
+        # Delta kandidat, skor inkremental, dan evaluasi penuh harus sama
+        assert solution.score - before == pytest.approx(deltas[0], abs=1e-9)
+        assert solution.score == pytest.approx(evaluate_solution(solution), abs=1e-9)
+
+    incremental = snapshot(solution)
+    solution.refresh()
+    for expected, actual in zip(incremental[0], snapshot(solution)[0]):
+        np.testing.assert_allclose(actual, expected, atol=1e-9)
+    assert solution.score == pytest.approx(incremental[1], abs=1e-9)
+
+
+def test_rollback_restores_state(solution):
+    instance = solution.instance
+    random.seed(2)
+    for _ in range(50):
+        before = snapshot(solution)
+        solution.begin()
+        for pos, g in sample_neighbor_moves(solution, instance, 5):
+            solution.move(pos, *instance.slot_key(g))
+        if len(solution.movable()):
+            solution.unassign(int(solution.movable()[0]))
+        solution.update_queues()
+        solution.rollback()
+
+        after = snapshot(solution)
+        for expected, actual in zip(before[0], after[0]):
+            np.testing.assert_array_equal(actual, expected)
+        assert after[1:] == before[1:]
+
+
+@pytest.mark.parametrize('name', sorted(ENGINES))
+def test_engine_score_matches_evaluate(generated, name):
+    battery_swap_station, ev = generated
+    random.seed(0)
+    options = {'n_chains': 2} if name == 'parallel_alns' else {}
+    solution, score, _ = solve(name, battery_swap_station, ev, 15, CHARGING_RATE, max_iter=20, time_budget_ms=2000, **options)
+    assert score == pytest.approx(evaluate(solution.to_dict(), solution.instance.objective), abs=1e-6)
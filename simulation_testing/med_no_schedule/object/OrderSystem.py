@@ -1,4 +1,3 @@
-import requests
 import random
 import math
 import time
@@ -6,6 +5,9 @@ import numpy as np
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from .Order import Order
+from problem_solving_agent.route_cache import RouteCache
+from problem_solving_agent.routing_client import RoutingClient
+from problem_solving_agent.geo import GridIndex
 
 OSRM_URL = "http://localhost:5000"
 
@@ -23,7 +25,7 @@ CENTRAL_SOUTH_JAKARTA_BOUNDS = {
 }
 
 class OrderSystem:
-    def __init__(self, env):
+    def __init__(self, env, distance_cache=None):
         self.env = env
         self.total_order = 0
         self.order_search_driver = []
@@ -32,13 +34,21 @@ class OrderSystem:
         self.order_failed = []
         
         # Cache for distance calculations
-        self.distance_cache = {}
+        # Dipakai bersama dengan simulation_utils (satu koneksi SQLite per proses simulasi),
+        # tanpa cache dari Simulation hanya disimpan di memori
+        self.distance_cache = distance_cache if distance_cache is not None else RouteCache()
+
+        # Klien OSRM dengan koneksi keep-alive, request satu batch dikirim bersamaan
+        self.routing_client = RoutingClient(OSRM_URL, max_concurrency=8, timeout=3)
+
+        # Indeks spasial posisi EV untuk mencari driver terdekat
+        self.ev_index = GridIndex()
         
         # Order generation tracking
         self.last_order_time = 0
         self.orders_generated_this_minute = 0
 
-    def generate_realistic_coordinates(self, is_central_south=True):
+    def generate_realistic_coordinates(self, is_central_south=True, snap=True):
         """Generate coordinates based on Jakarta geographic distribution"""
         if is_central_south:
             # 60% chance - Central/South Jakarta with hotspot concentration
@@ -60,6 +70,8 @@ class OrderSystem:
             lat = round(random.uniform(-6.4, -6.125), 6)
             lon = round(random.uniform(106.7, 107.0), 6)
         
+        if not snap:
+            return lat, lon
         return self.snap_to_road(lat, lon)
 
     def generate_order_distance(self):
@@ -84,8 +96,7 @@ class OrderSystem:
             
             # Generate the orders
             print(f"{env.now:.0f}min Panjang order:", orders_this_minute)
-            for _ in range(orders_this_minute):
-                order = self.create_realistic_order(start_time, simulation)
+            for order in self.create_realistic_orders(orders_this_minute, start_time):
                 print(f"{env.now:.0f} abis buat 1 order")
                 if order:
                     self.order_search_driver.append(order)
@@ -98,65 +109,69 @@ class OrderSystem:
             # Wait for next minute
             yield env.timeout(1)
 
-    def create_realistic_order(self, start_time, simulation):
-        """Create a single realistic order with distance and cost"""
-        try:
+    def create_realistic_orders(self, count, start_time):
+        """Create realistic orders for one minute with distance and cost"""
+        # Semua bilangan acak (termasuk di Order) diambil dulu dengan urutan yang sama seperti
+        # membuat order satu per satu, lalu snap asal, snap tujuan, dan rute semua order
+        # masing-masing diminta bersamaan. Order yang gagal dibuat dilewati (None), id hanya
+        # diberikan ke order yang berhasil
+        orders, drafts = [], []
+        for _ in range(count):
             # Determine if order is in central/south Jakarta (60% probability)
             is_central = random.random() < 0.6
-            
-            # Generate origin coordinates
-            origin_lat, origin_lon = self.generate_realistic_coordinates(is_central)
-            
-            # Generate order distance
+            origin = self.generate_realistic_coordinates(is_central, snap=False)
             order_distance = self.generate_order_distance()
-            
-            # Calculate destination based on order distance and random direction
             bearing = random.uniform(0, 2 * math.pi)
-            lat_offset = (order_distance / 111.0) * math.cos(bearing)
+            drafts.append((origin, order_distance, bearing))
+            orders.append(Order(None))
+
+        origins = self.snap_to_road_many([origin for origin, _, _ in drafts])
+
+        destinations = []
+        for (origin_lat, origin_lon), (_, order_distance, bearing) in zip(origins, drafts):
+            # Calculate destination based on order distance and random direction
+            lat_offset = (order_distance / 111.0) * math.cos(bearing)  # 1 degree ≈ 111km
             lon_offset = (order_distance / (111.0 * math.cos(math.radians(origin_lat)))) * math.sin(bearing)
-            
-            destination_lat = origin_lat + lat_offset
-            destination_lon = origin_lon + lon_offset
-            destination_lat, destination_lon = self.snap_to_road(destination_lat, destination_lon)
-            
-            # Create enhanced order
-            order = Order(self.total_order + 1)
-            order.order_origin_lat = origin_lat
-            order.order_origin_lon = origin_lon
-            order.order_destination_lat = destination_lat
-            order.order_destination_lon = destination_lon
-            order.created_at = (start_time + timedelta(minutes=self.env.now)).isoformat()
-            
-            # Calculate distance and cost
-            actual_distance, actual_duration = self.get_distance_and_duration_real(
-                origin_lat, origin_lon, destination_lat, destination_lon
-            )
+            destinations.append((origin_lat + lat_offset, origin_lon + lon_offset))
+        destinations = self.snap_to_road_many(destinations)
+
+        routes = self.get_distance_and_duration_real_many(list(zip(origins, destinations)))
+
+        created = 0
+        for i, (order, origin, destination, route) in enumerate(zip(orders, origins, destinations, routes)):
+            try:
+                distance, duration = route
+                order.id = self.total_order + created + 1
+                order.order_origin_lat, order.order_origin_lon = origin
+                order.order_destination_lat, order.order_destination_lon = destination
+                order.created_at = (start_time + timedelta(minutes=self.env.now)).isoformat()
+
+                order.distance = distance
+                order.energy_distance = (distance * 100) / 65
+                order.cost = order.distance * 3000
+                created += 1
+            except Exception as e:
+                print(f"Error creating realistic order: {e}")
+                orders[i] = None
+
+        return orders
 
-            order.distance = actual_distance
-            order.energy_distance = (actual_distance * 100) / 65
-            order.cost = order.distance * 3000
-            
-            return order
-            
-        except Exception as e:
-            print(f"Error creating realistic order: {e}")
-            return None
-        
     def search_driver(self, env, fleet_ev_motorbikes, battery_swap_station, start_time):
         """Enhanced driver search with realistic constraints"""
         while True:
             if self.order_search_driver:
+                # Posisi EV di indeks dan daftar EV yang tersedia diperbarui sekali per menit
+                self.ev_index.sync((ev.id, ev.current_lat, ev.current_lon) for ev in fleet_ev_motorbikes.values())
+                available_evs = {
+                    ev.id: ev for ev in fleet_ev_motorbikes.values()
+                    if (ev.status == "idle" and
+                        ev.online_status == "online")
+                }
+
                 # Process orders in batches for efficiency
                 orders_to_process = self.order_search_driver
                 
                 for order in orders_to_process:
-                    # Get available EVs (less restrictive criteria)
-                    available_evs = [
-                        ev for ev in fleet_ev_motorbikes.values()
-                        if (ev.status == "idle" and 
-                            ev.online_status == "online")
-                    ]
-                    
                     if not available_evs:
                         order.searching_time += 1
                         if order.searching_time >= 20:  # Reduced timeout for realism
@@ -184,6 +199,7 @@ class OrderSystem:
                         order.assigned_motorbike_id = best_ev.id
                         self.order_search_driver.remove(order)
                         self.order_active.append(order)
+                        del available_evs[best_ev.id]
                     else:
                         order.searching_time += 1
                         if order.searching_time >= 20:
@@ -196,22 +212,14 @@ class OrderSystem:
 
     def find_best_ev_for_order(self, order, available_evs):
         """Find the best EV for a specific order - enhanced to be less restrictive"""
-        best_ev = None
-        min_distance = float('inf')
-        
-        for ev in available_evs:
-            # Calculate distance to order pickup
-            distance_to_order, duration_to_order = self.get_distance_and_duration(
-                ev.current_lat, ev.current_lon,
-                order.order_origin_lat, order.order_origin_lon
-            )
-            
-            # More lenient distance check
-            if distance_to_order < min_distance:  # Increased from 15km to 20km
-                min_distance = distance_to_order
-                best_ev = ev
-        
-        return best_ev
+        # EV tersedia terdekat dari titik jemput, lewat indeks spasial (jarak haversine)
+        nearest = self.ev_index.nearest(
+            order.order_origin_lat, order.order_origin_lon,
+            predicate=lambda ev_id: ev_id in available_evs
+        )
+        if not nearest:
+            return None
+        return available_evs[nearest[0][0]]
 
     def get_distance_and_duration(self, origin_lat, origin_lon, destination_lat, destination_lon, max_retries=2):
         """Get distance and duration with fallback"""
@@ -235,24 +243,30 @@ class OrderSystem:
     
     def get_distance_and_duration_real(self, origin_lat, origin_lon, destination_lat, destination_lon):
         """Get distance and duration with fallback"""
-        # Pakai OSRM kelamaan
+        return self.get_distance_and_duration_real_many([((origin_lat, origin_lon), (destination_lat, destination_lon))])[0]
 
-        try:
-            url = f"{OSRM_URL}/route/v1/driving/{origin_lon},{origin_lat};{destination_lon},{destination_lat}?overview=false"
-            response = requests.get(url, timeout=3)
-            data = response.json()
+    def get_distance_and_duration_real_many(self, pairs):
+        # pairs: [((lat, lon), (lat, lon))]. Rute yang belum ada di cache diminta bersamaan,
+        # request yang gagal memakai estimasi haversine (tidak disimpan ke cache)
+        # Pita kecepatan mengikuti jam simulasi, bukan jam dinding
+        hour = int(self.env.now // 60) % 24
+        results = [self.distance_cache.get(*origin, *destination, hour) for origin, destination in pairs]
+        missing = [i for i, result in enumerate(results) if result is None]
+        resolved = []
+        for i, route in zip(missing, self.routing_client.resolve([pairs[i] for i in missing])):
+            origin, destination = pairs[i]
+            try:
+                distance_km = max(route[0] / 1000, 0.000001)
+                duration_min = max(round(route[1] / (60 * 2), 2), 0.000001)
+            except (TypeError, ValueError):
+                # Request gagal atau respons tidak lengkap: estimasi haversine untuk pasangan ini saja
+                results[i] = self.haversine_distance(*origin, *destination)
+                continue
+            results[i] = (distance_km, duration_min)
+            resolved.append(((*origin, *destination), results[i]))
+        self.distance_cache.put_many(resolved, hour)
+        return results
 
-            if data["code"] == "Ok":
-                route = data["routes"][0]
-                distance_km = max(route["distance"] / 1000, 0.000001)
-                duration_min = max(round(route["duration"] / (60 * 2), 2), 0.000001)
-                return distance_km, duration_min          
-        except:
-            # Fallback to haversine calculation
-            return self.haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon)
-        
-        return self.haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon)
-        
     def haversine_distance(self, origin_lat, origin_lon, destination_lat, destination_lon):
         """Haversine distance calculation"""
         R = 6371
@@ -270,16 +284,8 @@ class OrderSystem:
 
     def snap_to_road(self, lat, lon, max_retries=1):
         """Snap coordinates to road"""
-        try:
-            url = f"{OSRM_URL}/nearest/v1/driving/{lon},{lat}"
-            response = requests.get(url, timeout=2)
-            data = response.json()
+        return self.snap_to_road_many([(lat, lon)])[0]
 
-            if data.get("code") == "Ok" and data.get("waypoints"):
-                snapped = data["waypoints"][0]["location"]
-                return snapped[1], snapped[0]  # return lat, lon
-                
-        except:
-            pass
-        
-        return lat, lon
+    def snap_to_road_many(self, points):
+        # Snap banyak titik sekaligus, titik yang gagal di-snap dipakai apa adanya
+        return [snapped or point for point, snapped in zip(points, self.routing_client.snap(points))]
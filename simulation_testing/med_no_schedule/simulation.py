@@ -20,7 +20,8 @@ from object.BatterySwapStation import BatterySwapStation
 from object.Battery import Battery
 from object.OrderSystem import OrderSystem
 from object.Order import Order
-from simulation_utils import snap_to_road, get_distance_and_duration, get_distance_and_duration_real
+from problem_solving_agent.geo import build_station_index, nearest_station
+from simulation_utils import ROUTE_CACHE, snap_to_road, get_distance_and_duration_real
 
 OSRM_URL = "http://localhost:5000"
 
@@ -95,7 +96,8 @@ class Simulation:
         self.jumlah_stations = jumlah_stations
         self.fleet_ev_motorbikes = {}
         self.battery_swap_station = {}
-        self.order_system = OrderSystem(self.env)
+        self.station_index = None  # GridIndex stasiun, dibangun di setup_battery_swap_station
+        self.order_system = OrderSystem(self.env, distance_cache=ROUTE_CACHE)
         self.battery_registry = {}
         self.battery_counter = [0]
         
@@ -268,6 +270,9 @@ class Simulation:
             self.battery_swap_station[station_id] = station
             station_id += 1
 
+        # Indeks stasiun dibangun ulang setiap daftar stasiun berubah
+        self.station_index = build_station_index(self.battery_swap_station)
+
     def setup_fleet_ev_motorbike(self):
         """Setup enhanced EV fleet"""
         for i in range(self.jumlah_ev_motorbike):
@@ -362,8 +367,8 @@ class Simulation:
             order_destination_lat, order_destination_lon = snap_to_road(order_destination_lat, order_destination_lon)
             
             # Calculate energy needed (100% battery = 65km)
-            order_distance_real, order_duration_real = get_distance_and_duration_real(order_origin_lat, order_origin_lon, order_destination_lat, order_destination_lon)
-            distance_to_order, duration_to_order = get_distance_and_duration_real(lat, lon, order_origin_lat, order_origin_lon)
+            order_distance_real, order_duration_real = get_distance_and_duration_real(order_origin_lat, order_origin_lon, order_destination_lat, order_destination_lon, hour=self.get_current_hour())
+            distance_to_order, duration_to_order = get_distance_and_duration_real(lat, lon, order_origin_lat, order_origin_lon, hour=self.get_current_hour())
             total_distance = distance_to_order + order_distance_real
             energy_needed = (total_distance / 65.0) * 100  # Convert to battery percentage
             
@@ -399,36 +404,21 @@ class Simulation:
     
     def find_nearest_station_energy(self, lat, lon):
         """Find energy needed to reach nearest battery station"""
+        # Stasiun terdekat (haversine) dicari lewat indeks grid stasiun
         station_lat = 0
         station_lon = 0
-        min_energy = float('inf')
-        for station in self.battery_swap_station.values():
-            distance, duration = get_distance_and_duration(lat,lon, station.lat, station.lon)
-            energy = (distance / 65.0) * 100  # Convert to battery percentage
-            if energy < min_energy:
-                min_energy = energy
-                station_lat = station.lat
-                station_lon = station.lon
-        min_distance, min_duration = get_distance_and_duration_real(lat,lon, station_lat, station_lon)
+        station_id, _ = nearest_station(lat, lon, self.station_index)
+        if station_id is not None:
+            station_lat = self.battery_swap_station[station_id].lat
+            station_lon = self.battery_swap_station[station_id].lon
+        min_distance, min_duration = get_distance_and_duration_real(lat,lon, station_lat, station_lon, hour=self.get_current_hour())
         min_energy = (min_distance / 65.0) * 100
         return min_energy
 
     def find_nearest_station(self, ev):
         """Find nearest battery swap station"""
-        nearest_station = None
-        min_distance = float('inf')
-        
-        for station_id, station in self.battery_swap_station.items():
-            distance, duration = get_distance_and_duration(
-                ev.current_lat, ev.current_lon,
-                station.lat, station.lon
-            )
-            
-            if distance < min_distance:
-                min_distance = distance
-                nearest_station = station_id
-        
-        return nearest_station, min_distance
+        # Stasiun terdekat lewat indeks spasial stasiun (jarak haversine)
+        return nearest_station(ev.current_lat, ev.current_lon, self.station_index)
 
     def add_waiting_driver(self, ev_id, waiting_time):
         """Track waiting driver"""
@@ -1,4 +1,3 @@
-import requests
 import random
 import math
 import numpy as np
@@ -6,6 +5,9 @@ import time
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from .Order import Order
+from problem_solving_agent.route_cache import RouteCache
+from problem_solving_agent.routing_client import RoutingClient
+from problem_solving_agent.geo import GridIndex, nearest_station
 
 OSRM_URL = "http://localhost:5000"
 
@@ -22,7 +24,7 @@ CENTRAL_SOUTH_JAKARTA_BOUNDS = {
 }
 
 class OrderSystem:
-    def __init__(self, env):
+    def __init__(self, env, distance_cache=None):
         self.env = env
         self.total_order = 0
         self.order_search_driver = []
@@ -32,7 +34,18 @@ class OrderSystem:
         self.last_schedule_event = None
 
         # Cache for distance calculations
-        self.distance_cache = {}
+        # Dipakai bersama dengan simulation_utils (satu koneksi SQLite per proses simulasi),
+        # tanpa cache dari Simulation hanya disimpan di memori
+        self.distance_cache = distance_cache if distance_cache is not None else RouteCache()
+
+        # Klien OSRM dengan koneksi keep-alive, request satu batch dikirim bersamaan
+        self.routing_client = RoutingClient(OSRM_URL, max_concurrency=8, timeout=3)
+
+        # Indeks spasial posisi EV untuk mencari driver terdekat
+        self.ev_index = GridIndex()
+
+        # Indeks spasial stasiun, milik Simulation dan diisi ulang saat daftar stasiun berubah
+        self.station_index = None
         
         # Order generation tracking
         self.last_order_time = 0
@@ -41,7 +54,7 @@ class OrderSystem:
     def update_schedule_event(self, event):
         self.last_schedule_event = event
 
-    def generate_realistic_coordinates(self, is_central_south=True):
+    def generate_realistic_coordinates(self, is_central_south=True, snap=True):
         """Generate coordinates based on Jakarta geographic distribution"""
         if is_central_south:
             # 60% chance - Central/South Jakarta with hotspot concentration
@@ -63,6 +76,8 @@ class OrderSystem:
             lat = round(random.uniform(-6.4, -6.125), 6)
             lon = round(random.uniform(106.7, 107.0), 6)
         
+        if not snap:
+            return lat, lon
         return self.snap_to_road(lat, lon)
 
     def generate_order_distance(self):
@@ -87,8 +102,7 @@ class OrderSystem:
             
             # Generate the orders
             print(f"{env.now:.0f}min Panjang order:", orders_this_minute)
-            for _ in range(orders_this_minute):
-                order = self.create_realistic_order(start_time)
+            for order in self.create_realistic_orders(orders_this_minute, start_time):
                 print(f"{env.now:.0f} abis buat 1 order")
                 if order:
                     self.order_search_driver.append(order)
@@ -101,51 +115,52 @@ class OrderSystem:
             # Wait for next minute
             yield env.timeout(1)
 
-    def create_realistic_order(self, start_time):
-        """Create a single realistic order"""
-        try:
+    def create_realistic_orders(self, count, start_time):
+        """Create realistic orders for one minute"""
+        # Semua bilangan acak (termasuk di Order) diambil dulu dengan urutan yang sama seperti
+        # membuat order satu per satu, lalu snap asal, snap tujuan, dan rute semua order
+        # masing-masing diminta bersamaan. Order yang gagal dibuat dilewati (None), id hanya
+        # diberikan ke order yang berhasil
+        orders, drafts = [], []
+        for _ in range(count):
             # Determine if order is in central/south Jakarta (60% probability)
             is_central = random.random() < 0.6
-            
-            # Generate origin coordinates
-            origin_lat, origin_lon = self.generate_realistic_coordinates(is_central)
-            
-            # Generate order distance
+            origin = self.generate_realistic_coordinates(is_central, snap=False)
             order_distance = self.generate_order_distance()
-            
-            # Calculate destination based on order distance and random direction
             bearing = random.uniform(0, 2 * math.pi)
+            drafts.append((origin, order_distance, bearing))
+            orders.append(Order(None))
+
+        origins = self.snap_to_road_many([origin for origin, _, _ in drafts])
+
+        destinations = []
+        for (origin_lat, origin_lon), (_, order_distance, bearing) in zip(origins, drafts):
+            # Calculate destination based on order distance and random direction
             lat_offset = (order_distance / 111.0) * math.cos(bearing)  # 1 degree ≈ 111km
             lon_offset = (order_distance / (111.0 * math.cos(math.radians(origin_lat)))) * math.sin(bearing)
-            
-            destination_lat = origin_lat + lat_offset
-            destination_lon = origin_lon + lon_offset
-            destination_lat, destination_lon = self.snap_to_road(destination_lat, destination_lon)
-            
-            # Create order
-            order = Order(self.total_order + 1)
-            order.order_origin_lat = origin_lat
-            order.order_origin_lon = origin_lon
-            order.order_destination_lat = destination_lat
-            order.order_destination_lon = destination_lon
-            order.created_at = (start_time + timedelta(minutes=self.env.now)).isoformat()
-
-            distance, duration = self.get_distance_and_duration_real(origin_lat, origin_lon, destination_lat, destination_lon, max_retries=2)
-
-            # print("distance order", distance)
-            # print("Order distance nepu", order_distance)
-            # print("Order distance asli", distance)
-            # print("Energy yang dibutuhkan nepu", (order_distance / 65.0) * 100)
-            # print("Energy yang dibutuhkan asli", (distance / 65.0) * 100)
-            order.energy_distance = (distance / 65.0) * 100
-            order.distance = distance
-            order.cost = distance * 3000
-            
-            return order
-            
-        except Exception as e:
-            print(f"Error creating realistic order: {e}")
-            return None
+            destinations.append((origin_lat + lat_offset, origin_lon + lon_offset))
+        destinations = self.snap_to_road_many(destinations)
+
+        routes = self.get_distance_and_duration_real_many(list(zip(origins, destinations)))
+
+        created = 0
+        for i, (order, origin, destination, route) in enumerate(zip(orders, origins, destinations, routes)):
+            try:
+                distance, duration = route
+                order.id = self.total_order + created + 1
+                order.order_origin_lat, order.order_origin_lon = origin
+                order.order_destination_lat, order.order_destination_lon = destination
+                order.created_at = (start_time + timedelta(minutes=self.env.now)).isoformat()
+
+                order.energy_distance = (distance / 65.0) * 100
+                order.distance = distance
+                order.cost = distance * 3000
+                created += 1
+            except Exception as e:
+                print(f"Error creating realistic order: {e}")
+                orders[i] = None
+
+        return orders
 
     def search_driver(self, env, fleet_ev_motorbikes, battery_swap_station, start_time):
         """Enhanced driver search with realistic constraints"""
@@ -156,17 +171,18 @@ class OrderSystem:
             print("Schedule udah kelar")
 
             if self.order_search_driver:
+                # Posisi EV di indeks dan daftar EV yang tersedia diperbarui sekali per menit
+                self.ev_index.sync((ev.id, ev.current_lat, ev.current_lon) for ev in fleet_ev_motorbikes.values())
+                available_evs = {
+                    ev.id: ev for ev in fleet_ev_motorbikes.values()
+                    if (ev.status == "idle" and
+                        ev.online_status == "online")
+                }
+
                 # Process orders in batches for efficiency
                 orders_to_process = self.order_search_driver
                 
                 for order in orders_to_process:
-                    # Get available EVs (less restrictive criteria)
-                    available_evs = [
-                        ev for ev in fleet_ev_motorbikes.values()
-                        if (ev.status == "idle" and 
-                            ev.online_status == "online")
-                    ]
-                    
                     if not available_evs:
                         order.searching_time += 1
                         if order.searching_time >= 20:  # Reduced timeout for realism
@@ -193,6 +209,7 @@ class OrderSystem:
                         order.assigned_motorbike_id = best_ev.id
                         self.order_search_driver.remove(order)
                         self.order_active.append(order)
+                        del available_evs[best_ev.id]
                     else:
                         order.searching_time += 1
                         if order.searching_time >= 10:
@@ -203,36 +220,25 @@ class OrderSystem:
 
             yield env.timeout(1)
 
-    def find_best_ev_for_order(self, order, available_evs, battery_swap_station):
+    def find_best_ev_for_order(self, order, available_evs, battery_swap_station, max_checks=5):
         """Find the best EV for a specific order with realistic constraints"""
-        best_evs = []
-        min_distance = float('inf')
-
         nearest_energy_to_bss = self.find_nearest_station_energy(order.order_destination_lat, order.order_destination_lon, battery_swap_station)
 
         order_distance = order.energy_distance
-        
-        for ev in available_evs:
-            # Calculate distance to order pickup
-            distance_to_order, duration_to_order = self.get_distance_and_duration(
-                ev.current_lat, ev.current_lon,
-                order.order_origin_lat, order.order_origin_lon
-            )
 
-            # Prefer closer EVs (more realistic)
-            if distance_to_order < min_distance:
-                # Calculate total energy needed (100% battery = 65km)
-                total_energy_needed = ((distance_to_order / 65.0) * 100) + nearest_energy_to_bss + order_distance
-                
-                # Check if EV has enough battery (with 20% buffer instead of 25%)
-                if (ev.battery.battery_now * (100 - ev.battery.cycle * 0.025)/100) >= (total_energy_needed + 5): # Buffer 5
-                    min_distance = distance_to_order
-                    best_evs.append(ev)
+        # EV tersedia diperiksa urut jarak haversine ke titik jemput. EV yang lolos cek baterai
+        # dengan jarak haversine dicek ulang dengan jarak OSRM, paling banyak max_checks EV
+        checks = 0
+        for ev_id, distance_to_order in self.ev_index.iter_nearest(order.order_origin_lat, order.order_origin_lon):
+            ev = available_evs.get(ev_id)
+            if ev is None:
+                continue
+
+            # Calculate total energy needed (100% battery = 65km)
+            total_energy_needed = ((distance_to_order / 65.0) * 100) + nearest_energy_to_bss + order_distance
+            if (ev.battery.battery_now * (100 - ev.battery.cycle * 0.025)/100) < (total_energy_needed + 5): # Buffer 5
+                continue
 
-        best_ev = None
-        
-        for ev in reversed(best_evs):
-            # proses EV dari belakang ke depan
             distance_to_order, duration_to_order = self.get_distance_and_duration_real(
                 ev.current_lat, ev.current_lon,
                 order.order_origin_lat, order.order_origin_lon
@@ -241,23 +247,23 @@ class OrderSystem:
             total_energy_needed = ((distance_to_order / 65.0) * 100) + nearest_energy_to_bss + order_distance
 
             if (ev.battery.battery_now * (100 - ev.battery.cycle * 0.025)/100) >= (total_energy_needed + 5): # Buffer 10
-                best_ev = ev
+                return ev
+
+            checks += 1
+            if checks >= max_checks:
                 break
 
-        return best_ev
-    
+        return None
+
     def find_nearest_station_energy(self, lat, lon, battery_swap_station):
         """Find energy needed to reach nearest battery station"""
+        # Stasiun terdekat (haversine) dicari lewat indeks grid stasiun
         station_lat = 0
         station_lon = 0
-        min_energy = float('inf')
-        for station in battery_swap_station.values():
-            distance, duration = self.get_distance_and_duration(lat,lon, station.lat, station.lon)
-            energy = (distance / 65.0) * 100  # Convert to battery percentage
-            if energy < min_energy:
-                min_energy = energy
-                station_lat = station.lat
-                station_lon = station.lon
+        station_id, _ = nearest_station(lat, lon, self.station_index)
+        if station_id is not None:
+            station_lat = battery_swap_station[station_id].lat
+            station_lon = battery_swap_station[station_id].lon
         min_distance, min_duration = self.get_distance_and_duration_real(lat,lon, station_lat, station_lon)
         min_energy = (min_distance / 65.0) * 100
         return min_energy
@@ -285,23 +291,30 @@ class OrderSystem:
     def get_distance_and_duration_real(self, origin_lat, origin_lon, destination_lat, destination_lon, max_retries=2):
         """Get distance and duration with fallback"""
         # Khusus Distance Order
+        return self.get_distance_and_duration_real_many([((origin_lat, origin_lon), (destination_lat, destination_lon))])[0]
+
+    def get_distance_and_duration_real_many(self, pairs):
+        # pairs: [((lat, lon), (lat, lon))]. Rute yang belum ada di cache diminta bersamaan,
+        # request yang gagal memakai estimasi haversine (tidak disimpan ke cache)
+        # Pita kecepatan mengikuti jam simulasi, bukan jam dinding
+        hour = int(self.env.now // 60) % 24
+        results = [self.distance_cache.get(*origin, *destination, hour) for origin, destination in pairs]
+        missing = [i for i, result in enumerate(results) if result is None]
+        resolved = []
+        for i, route in zip(missing, self.routing_client.resolve([pairs[i] for i in missing])):
+            origin, destination = pairs[i]
+            try:
+                distance_km = max(route[0] / 1000, 0.000001)
+                duration_min = max(round(route[1] / (60 * 2), 2), 0.000001)
+            except (TypeError, ValueError):
+                # Request gagal atau respons tidak lengkap: estimasi haversine untuk pasangan ini saja
+                results[i] = self.haversine_distance(*origin, *destination)
+                continue
+            results[i] = (distance_km, duration_min)
+            resolved.append(((*origin, *destination), results[i]))
+        self.distance_cache.put_many(resolved, hour)
+        return results
 
-        try:
-            url = f"{OSRM_URL}/route/v1/driving/{origin_lon},{origin_lat};{destination_lon},{destination_lat}?overview=false"
-            response = requests.get(url, timeout=3)
-            data = response.json()
-
-            if data["code"] == "Ok":
-                route = data["routes"][0]
-                distance_km = max(route["distance"] / 1000, 0.000001)
-                duration_min = max(round(route["duration"] / (60 * 2), 2), 0.000001)
-                return distance_km, duration_min          
-        except:
-            # Fallback to haversine calculation
-            return self.haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon)
-        
-        return self.haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon)
-        
     def haversine_distance(self, origin_lat, origin_lon, destination_lat, destination_lon):
         """Haversine distance calculation"""
         R = 6371
@@ -319,16 +332,8 @@ class OrderSystem:
 
     def snap_to_road(self, lat, lon, max_retries=1):
         """Snap coordinates to road"""
-        try:
-            url = f"{OSRM_URL}/nearest/v1/driving/{lon},{lat}"
-            response = requests.get(url, timeout=2)
-            data = response.json()
-
-            if data.get("code") == "Ok" and data.get("waypoints"):
-                snapped = data["waypoints"][0]["location"]
-                return snapped[1], snapped[0]  # return lat, lon
-                
-        except:
-            pass
-        
-        return lat, lon
\ No newline at end of file
+        return self.snap_to_road_many([(lat, lon)])[0]
+
+    def snap_to_road_many(self, points):
+        # Snap banyak titik sekaligus, titik yang gagal di-snap dipakai apa adanya
+        return [snapped or point for point, snapped in zip(points, self.routing_client.snap(points))]
@@ -22,8 +22,9 @@ from object.Battery import Battery
 from object.EVMotorBike import EVMotorBike
 from object.OrderSystem import OrderSystem
 from object.Order import Order
+from problem_solving_agent.geo import build_station_index, nearest_station
 from simulation_utils import (
-    get_distance_and_duration,
+    ROUTE_CACHE,
     apply_schedule_to_ev_fleet,
     add_and_save_swap_schedule,
     snap_to_road,
@@ -140,7 +141,8 @@ class Simulation:
         self.jumlah_stations = jumlah_stations
         self.fleet_ev_motorbikes = {}
         self.battery_swap_station = {}
-        self.order_system = OrderSystem(self.env)
+        self.station_index = None  # GridIndex stasiun, dibangun di setup_battery_swap_station
+        self.order_system = OrderSystem(self.env, distance_cache=ROUTE_CACHE)
         self.battery_registry = {}
         self.battery_counter = [0]
         
@@ -290,8 +292,8 @@ class Simulation:
             order_destination_lat, order_destination_lon = snap_to_road(order_destination_lat, order_destination_lon)
             
             # Calculate energy needed (100% battery = 65km)
-            distance_to_order, duration_to_order = get_distance_and_duration_real(lat, lon, order_origin_lat, order_origin_lon)
-            distance, duration = get_distance_and_duration_real(order_origin_lat, order_origin_lon, order_destination_lat, order_destination_lon)
+            distance_to_order, duration_to_order = get_distance_and_duration_real(lat, lon, order_origin_lat, order_origin_lon, hour=self.get_current_hour())
+            distance, duration = get_distance_and_duration_real(order_origin_lat, order_origin_lon, order_destination_lat, order_destination_lon, hour=self.get_current_hour())
             total_distance = distance_to_order + distance
             energy_needed = (total_distance / 65.0) * 100  # Convert to battery percentage
             
@@ -328,17 +330,14 @@ class Simulation:
 
     def find_nearest_station_energy(self, lat, lon):
         """Find energy needed to reach nearest battery station"""
+        # Stasiun terdekat (haversine) dicari lewat indeks grid stasiun
         station_lat = 0
         station_lon = 0
-        min_energy = float('inf')
-        for station in self.battery_swap_station.values():
-            distance, duration = get_distance_and_duration(lat,lon, station.lat, station.lon)
-            energy = (distance / 65.0) * 100  # Convert to battery percentage
-            if energy < min_energy:
-                min_energy = energy
-                station_lat = station.lat
-                station_lon = station.lon
-        min_distance, min_duration = get_distance_and_duration_real(lat,lon, station_lat, station_lon)
+        station_id, _ = nearest_station(lat, lon, self.station_index)
+        if station_id is not None:
+            station_lat = self.battery_swap_station[station_id].lat
+            station_lon = self.battery_swap_station[station_id].lon
+        min_distance, min_duration = get_distance_and_duration_real(lat,lon, station_lat, station_lon, hour=self.get_current_hour())
         min_energy = (min_distance / 65.0) * 100
         return min_energy
 
@@ -393,6 +392,10 @@ class Simulation:
             self.battery_swap_station[station_id] = station
             station_id += 1
 
+        # Indeks stasiun dibangun ulang setiap daftar stasiun berubah
+        self.station_index = build_station_index(self.battery_swap_station)
+        self.order_system.station_index = self.station_index
+
     def calculate_metrics(self):
         """Calculate comprehensive metrics"""
         # Scheduling-based metrics (from simulation.py)
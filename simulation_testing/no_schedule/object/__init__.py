@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul bersama (cache rute, klien OSRM, indeks spasial) ada di paket backend problem_solving_agent
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'backend'))
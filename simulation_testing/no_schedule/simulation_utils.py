@@ -5,9 +5,16 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(__file__))
+# Modul bersama (cache rute, klien OSRM) ada di paket backend problem_solving_agent
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
+
+from problem_solving_agent.route_cache import RouteCache
 
 OSRM_URL = "http://localhost:5000"
 
+# Cache rute OSRM, satu instance per proses dipakai bersama dengan OrderSystem
+ROUTE_CACHE = RouteCache(os.path.join(os.path.dirname(__file__), 'route_cache.db'))
+
 def get_distance_and_duration(origin_lat, origin_lon, destination_lat, destination_lon):
     # OSRM Kelamaan
 
@@ -36,7 +43,12 @@ def get_distance_and_duration(origin_lat, origin_lon, destination_lat, destinati
     # # Fallback to haversine calculation
     return haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon)
 
-def get_distance_and_duration_real(origin_lat, origin_lon, destination_lat, destination_lon):
+def get_distance_and_duration_real(origin_lat, origin_lon, destination_lat, destination_lon, hour=None):
+    # hour = jam simulasi, menentukan pita kecepatan entri cache
+    cached = ROUTE_CACHE.get(origin_lat, origin_lon, destination_lat, destination_lon, hour)
+    if cached is not None:
+        return cached
+
     try:
         url = f"{OSRM_URL}/route/v1/driving/{origin_lon},{origin_lat};{destination_lon},{destination_lat}?overview=false"
             
@@ -48,6 +60,7 @@ def get_distance_and_duration_real(origin_lat, origin_lon, destination_lat, dest
             route = data["routes"][0]
             distance_km = max(route["distance"] / 1000, 0.000001)
             duration_min = max(round(route["duration"] / (60 * 2), 2), 0.000001)
+            ROUTE_CACHE.put(origin_lat, origin_lon, destination_lat, destination_lon, (distance_km, duration_min), hour)
             return distance_km, duration_min
         else:
             return haversine_distance(origin_lat, origin_lon, destination_lat, destination_lon)